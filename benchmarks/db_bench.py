@@ -0,0 +1,86 @@
+"""
+Micro-benchmark of per-call SQLite access against pooled WAL connections
+
+Usage:
+    python -m benchmarks.db_bench [--runs N]
+
+Runs against a throwaway database so the bot's own bot.db is never touched.
+The "legacy" rows reproduce the old connect-per-call get_db().
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Callable, Generator, List
+
+
+def _report(name: str, samples: List[float]) -> None:
+    """Print latency summary in microseconds"""
+    samples_us = sorted(sample * 1_000_000 for sample in samples)
+    p95 = samples_us[int(len(samples_us) * 0.95) - 1]
+    print(
+        f"{name:<20} n={len(samples_us):<6} "
+        f"mean={statistics.mean(samples_us):>10.1f}us "
+        f"p50={statistics.median(samples_us):>10.1f}us "
+        f"p95={p95:>10.1f}us"
+    )
+
+
+def _time(call: Callable[[], object], runs: int) -> List[float]:
+    """Time repeated calls"""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=2000)
+    args = parser.parse_args()
+
+    from bot import db
+    from bot.logger import logger
+
+    # Per-write info logs would dominate the timings
+    logger.setLevel(logging.WARNING)
+    db.DB_PATH = os.path.join(tempfile.mkdtemp(), "bench.db")
+    db.init_db()
+    db.init_default_config()
+    db.update_last_message_id("bench", 1)
+    pooled = db.get_db
+
+    @contextmanager
+    def legacy_get_db() -> Generator[sqlite3.Connection, None, None]:
+        os.makedirs(os.path.dirname(db.DB_PATH), exist_ok=True)
+        conn = sqlite3.connect(db.DB_PATH)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    for label, get_db in (("legacy", legacy_get_db), ("pooled", pooled)):
+        db.get_db = get_db  # type: ignore[assignment]
+        _report(
+            f"{label} read", _time(lambda: db.get_last_message_id("bench"), args.runs)
+        )
+        _report(f"{label} config", _time(db.get_config, args.runs))
+        _report(
+            f"{label} write",
+            _time(lambda: db.update_last_message_id("bench", 2), args.runs),
+        )
+
+    db.get_db = pooled
+    db.close_db()
+
+
+if __name__ == "__main__":
+    main()
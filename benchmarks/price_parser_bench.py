@@ -0,0 +1,123 @@
+"""
+Micro-benchmark of local price extraction against the Gemini endpoint
+
+Usage:
+    python -m benchmarks.price_parser_bench [--stub] [--remote-runs N]
+
+With --stub a local server emulating generateContent is started and
+GEMINI_BASE_URL is pointed at it, so the remote path can be measured offline.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import Callable, List
+from aiohttp import web
+
+CORPUS: List[str] = [
+    "250₺=7.30$=6.75€",
+    "250 tl",
+    "1.250,00 tl",
+    "fiyat: ₺1.250",
+    "nike air max 42 numara 1.750 tl kargo dahil",
+    "12,5 tl",
+    "indirimli 899tl",
+    "2.499,90 ₺ = 74$ = 68€",
+    "eski fiyat 300 tl yeni fiyat 250 tl",
+    "1 250 tl",
+]
+
+STUB_PORT = 8799
+
+
+def _report(name: str, samples: List[float]) -> None:
+    """Print latency summary in microseconds"""
+    samples_us = sorted(sample * 1_000_000 for sample in samples)
+    p95 = samples_us[int(len(samples_us) * 0.95) - 1]
+    print(
+        f"{name:<8} n={len(samples_us):<6} "
+        f"mean={statistics.mean(samples_us):>10.1f}us "
+        f"p50={statistics.median(samples_us):>10.1f}us "
+        f"p95={p95:>10.1f}us"
+    )
+
+
+def bench_local(extract: Callable, runs: int) -> List[float]:
+    """Time local extraction over the corpus"""
+    samples = []
+    for _ in range(runs):
+        for text in CORPUS:
+            started = time.perf_counter()
+            extract(text)
+            samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def bench_remote(runs: int) -> List[float]:
+    """Time single-text Gemini extraction over the corpus"""
+    from bot.http_client import close_http_session
+    from bot.price_parser import _extract_price_with_gemini
+
+    samples = []
+    try:
+        for _ in range(runs):
+            for text in CORPUS:
+                started = time.perf_counter()
+                await _extract_price_with_gemini(text)
+                samples.append(time.perf_counter() - started)
+    finally:
+        await close_http_session()
+    return samples
+
+
+async def start_stub() -> web.AppRunner:
+    """Start local generateContent stub"""
+
+    async def generate_content(request: web.Request) -> web.Response:
+        await asyncio.sleep(0.001)
+        return web.json_response(
+            {"candidates": [{"content": {"parts": [{"text": "250 TL"}]}}]}
+        )
+
+    app = web.Application()
+    app.router.add_post("/v1beta/models/{model}", generate_content)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", STUB_PORT).start()
+    return runner
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stub", action="store_true", help="use local stub")
+    parser.add_argument("--local-runs", type=int, default=1000)
+    parser.add_argument("--remote-runs", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.stub:
+        # Must be set before bot settings are imported
+        os.environ["GEMINI_BASE_URL"] = f"http://127.0.0.1:{STUB_PORT}/v1beta"
+
+    from bot import db
+    from bot.price_extractor import extract_price_locally
+
+    # Keep the benchmark away from the bot's own database
+    db.DB_PATH = os.path.join(tempfile.mkdtemp(), "bench.db")
+    db.init_db()
+    db.init_default_config()
+
+    _report("local", bench_local(extract_price_locally, args.local_runs))
+
+    runner = await start_stub() if args.stub else None
+    try:
+        _report("remote", await bench_remote(args.remote_runs))
+    finally:
+        if runner:
+            await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,138 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Final, List
+from telethon.tl.types import Message
+from .price_parser import is_fee_message
+from .settings import ALBUM_SETTLE_SECONDS
+
+# Telegram accepts at most this many media in one album
+ALBUM_MAX_ITEMS: Final[int] = 10
+
+
+@dataclass
+class Album:
+    """Media messages of one post with the message carrying its price"""
+
+    price_message: Message | None = None
+    media_messages: List[Message] = field(default_factory=list)
+    # Last message ID that is fully handled once this album is enqueued
+    checkpoint_id: int = 0
+
+    @property
+    def message_ids(self) -> List[int]:
+        ids = [msg.id for msg in self.media_messages]
+        if self.price_message and self.price_message not in self.media_messages:
+            ids.append(self.price_message.id)
+        return sorted(ids)
+
+    def chunks(self) -> List[List[Message]]:
+        """Split media into chunks Telegram accepts as a single album"""
+        return [
+            self.media_messages[index : index + ALBUM_MAX_ITEMS]
+            for index in range(0, len(self.media_messages), ALBUM_MAX_ITEMS)
+        ]
+
+
+def _is_price_message(msg: Message) -> bool:
+    return bool(msg.text and is_fee_message(msg.text))
+
+
+def _is_recent(msg: Message) -> bool:
+    """Check if message is young enough for its album to still be uploading"""
+    if msg.date is None:
+        return False
+    age = datetime.now(timezone.utc) - msg.date
+    return age < timedelta(seconds=ALBUM_SETTLE_SECONDS)
+
+
+class AlbumAssembler:
+    """Assemble albums from oldest-first messages by Telegram grouped_id"""
+
+    def __init__(self) -> None:
+        # Messages of albums that may continue on the next fetch
+        self._buffer: List[Message] = []
+        self.settled_id = 0
+        # Whether the last page left recent messages for the next run
+        self.held = False
+
+    def _index_albums(self) -> List[Album]:
+        """Index buffered messages by grouped_id in one pass"""
+        albums: List[Album] = []
+        by_group: Dict[int, Album] = {}
+        pending_price: Message | None = None
+
+        for msg in self._buffer:
+            if msg.media:
+                album = by_group.get(msg.grouped_id) if msg.grouped_id else None
+                if album is None:
+                    # A price posted right before the album belongs to it
+                    album = Album(price_message=pending_price)
+                    pending_price = None
+                    albums.append(album)
+                    if msg.grouped_id:
+                        by_group[msg.grouped_id] = album
+
+                album.media_messages.append(msg)
+                if _is_price_message(msg):
+                    album.price_message = msg
+            elif _is_price_message(msg):
+                pending_price = msg
+
+        if pending_price:
+            # Price still waiting for its album
+            albums.append(Album(price_message=pending_price))
+        return albums
+
+    def _open_albums_start(self, albums: List[Album], default: int) -> int:
+        """Get first message ID of albums that may continue on the next page"""
+        # Albums seen in the trailing run of grouped media may still grow
+        open_groups = set()
+        for msg in reversed(self._buffer):
+            if not (msg.media and msg.grouped_id):
+                break
+            open_groups.add(msg.grouped_id)
+
+        starts = [
+            album.message_ids[0]
+            for album in albums
+            if album.media_messages
+            and album.media_messages[0].grouped_id in open_groups
+        ]
+        # A price waiting for its album
+        if albums and not albums[-1].media_messages:
+            starts.append(albums[-1].message_ids[0])
+
+        return min(starts, default=default)
+
+    def feed(self, messages: List[Message], final: bool = False) -> List[Album]:
+        """Add oldest-first messages and return albums that are complete"""
+        self._buffer.extend(messages)
+        if not self._buffer:
+            return []
+
+        newest_id = self._buffer[-1].id
+        albums = self._index_albums()
+
+        keep_from = newest_id + 1
+        if not final or _is_recent(self._buffer[-1]):
+            # On the last page a recent album may still be uploading and a
+            # price may still wait for it, the next run fetches them again
+            keep_from = self._open_albums_start(albums, keep_from)
+
+        completed = [
+            album
+            for album in albums
+            if album.media_messages and album.message_ids[-1] < keep_from
+        ]
+        for index, album in enumerate(completed):
+            next_start = keep_from
+            if index + 1 < len(completed):
+                next_start = min(next_start, completed[index + 1].message_ids[0])
+            album.checkpoint_id = max(
+                self.settled_id, min(album.message_ids[-1], next_start - 1)
+            )
+
+        self._buffer = [msg for msg in self._buffer if msg.id >= keep_from]
+        self.settled_id = max(self.settled_id, keep_from - 1)
+        self.held = final and bool(self._buffer)
+        return completed
@@ -1,12 +1,19 @@
 from typing import AsyncGenerator, Any
 from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
 from .routes import router
-from ..db import init_db, init_default_config
+from ..async_db import stop_db_workers
+from ..db import close_db, init_db, init_default_config
 from ..logger import logger
-import asyncio
-from ..scheduler import scheduler
+from ..metrics import render_metrics
+from ..scheduler import start_scheduler, stop_scheduler
+from ..client import disconnect_client
+from ..http_client import close_http_session, get_http_session
+from ..outbox import start_outbox_workers, stop_outbox_workers
+from ..status import cancel_status_refresh
+from ..peer_cache import load_peer_cache
 
 
 @asynccontextmanager
@@ -21,8 +28,13 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         init_default_config()
         logger.info("Database initialized successfully")
 
-        # Start scheduler in background task
-        asyncio.create_task(scheduler())
+        await load_peer_cache()
+
+        get_http_session()
+
+        # Start scheduler and outbox send workers in background tasks
+        start_scheduler()
+        start_outbox_workers()
         logger.info("Scheduler started successfully")
     except Exception as e:
         logger.error(f"Failed to initialize application: {e}")
@@ -32,6 +44,14 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
 
     # Shutdown
     logger.info("FastAPI application shutting down")
+    # Runs still in flight would reconnect the client and restart DB workers
+    await stop_scheduler()
+    await stop_outbox_workers()
+    await cancel_status_refresh()
+    await disconnect_client()
+    await close_http_session()
+    await stop_db_workers()
+    close_db()
 
 
 app = FastAPI(
@@ -75,6 +95,14 @@ async def add_cors_headers(request: Request, call_next: Any) -> Response:
     return response
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Metrics in the Prometheus text exposition format"""
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.get("/health")
 async def health_check() -> dict[str, str]:
     """Health check endpoint"""
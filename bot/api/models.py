@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, List
+from ..config import ChannelSchedule
 
 
 class BotConfig(BaseModel):
@@ -13,6 +14,8 @@ class BotConfig(BaseModel):
     gemini_api_key: str
     is_active: bool
     interval_minutes: int
+    realtime_mode: bool = False
+    channel_schedules: Dict[str, ChannelSchedule] = {}
 
 
 class ConfigResponse(BotConfig):
@@ -24,3 +27,11 @@ class MessageResponse(BaseModel):
     """Message processing response"""
     status: str
     message: str
+
+
+class StatusResponse(MessageResponse):
+    """Bot status snapshot"""
+    last_run: dict | None = None
+    next_run_at: str | None = None
+    channels: List[dict] = []
+    outbox: Dict[str, int] = {}
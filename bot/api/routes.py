@@ -1,16 +1,32 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from datetime import datetime, timezone
+from typing import AsyncGenerator, Dict, List
 import json
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 import secrets
 from pydantic import BaseModel
 
-from ..db import get_run_history, get_db
-from .models import ConfigResponse, MessageResponse, BotConfig
+from ..async_db import db_read, db_write
+from ..db import (
+    get_channel_runs,
+    get_duplicate_counts,
+    get_run_history,
+    get_run_history_after,
+    get_run_history_rollup,
+    reset_db_except_config,
+    update_configs,
+)
+from .models import ConfigResponse, MessageResponse, BotConfig, StatusResponse
 from ..logger import logger
-from ..config import get_config
-from ..utils import get_status_message
+from ..config import get_channel_schedule, get_config
+from ..scheduler import request_run, wake_scheduler
+from ..status import get_status_snapshot, refresh_status_snapshot
 from ..client import is_bot_logged, send_login_code, login_bot_with_code
+from ..rate_limiter import get_send_rates
+from ..price_cache import get_price_cache_stats
+from ..poll_rates import effective_interval
+from ..utils import get_channel_due_times
 
 router = APIRouter()
 
@@ -20,7 +36,7 @@ security = HTTPBasic()
 
 def verify_password(credentials: HTTPBasicCredentials = Depends(security)) -> bool:
     """Verify password for authentication"""
-    config = get_config(force=True)
+    config = get_config()
     is_correct = secrets.compare_digest(
         credentials.password.encode("utf8"), config.admin_password.encode("utf8")
     )
@@ -38,7 +54,7 @@ def verify_password(credentials: HTTPBasicCredentials = Depends(security)) -> bo
 async def get_configuration() -> ConfigResponse:
     """Get current configuration"""
     try:
-        config = get_config(force=True)
+        config = get_config()
         return ConfigResponse(**config.__dict__)
     except Exception as e:
         logger.error(f"Error getting configuration: {e}")
@@ -51,18 +67,9 @@ async def bulk_update_configuration(config_updates: BotConfig) -> MessageRespons
     try:
         config_dict = config_updates.model_dump(mode="json")
 
-        with get_db() as conn:
-            for key, value in config_dict.items():
-                conn.execute(
-                    """
-                    INSERT OR REPLACE INTO config (key, value, updated_at)
-                    VALUES (?, ?, CURRENT_TIMESTAMP)
-                    """,
-                    (key, json.dumps(value)),
-                )
-            conn.commit()
-
+        await db_write(update_configs, config_dict)
         get_config(force=True)
+        await refresh_status_snapshot()
 
         return MessageResponse(
             status="success", message="Tüm ayarlar başarıyla güncellendi"
@@ -72,40 +79,159 @@ async def bulk_update_configuration(config_updates: BotConfig) -> MessageRespons
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/status", response_model=MessageResponse)
-async def get_status() -> MessageResponse:
-    """Get bot status"""
-    try:
-        config = get_config(force=True)
-        status_message = get_status_message(config)
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in tags or "*" in tags
 
-        return MessageResponse(
-            status="active" if config.is_active else "inactive",
-            message=status_message,
-        )
+
+@router.get("/status", response_model=StatusResponse)
+async def get_status(request: Request) -> Response:
+    """Get precomputed bot status, 304 when unchanged since the client's copy"""
+    try:
+        snapshot, etag = await get_status_snapshot()
     except Exception as e:
         logger.error(f"Error getting status: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+    # no-cache makes browsers revalidate every poll instead of serving stale
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(snapshot, headers=headers)
+
+
+EXPORT_PAGE_SIZE = 1000
+
+
+def _to_db_time(value: datetime | None) -> str | None:
+    """Format datetime like CURRENT_TIMESTAMP (UTC)"""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
 
 @router.get("/history", response_model=List[dict])
-async def get_history() -> List[dict]:
-    """Get run history"""
+async def get_history(
+    response: Response,
+    limit: int = Query(10, ge=1, le=500),
+    before: int | None = Query(None, description="Return entries older than id"),
+    type: str | None = None,
+    status: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> List[dict]:
+    """Get run history newest first, next page cursor in X-Next-Cursor"""
     try:
-        history = get_run_history()
-        return history
+        history = await db_read(
+            get_run_history,
+            limit,
+            before,
+            type,
+            status,
+            _to_db_time(since),
+            _to_db_time(until),
+        )
     except Exception as e:
         logger.error(f"Error getting history: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+    if len(history) == limit:
+        response.headers["X-Next-Cursor"] = str(history[-1]["id"])
+    return history
+
+
+@router.get("/history/export")
+async def export_history(
+    type: str | None = None,
+    status: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> StreamingResponse:
+    """Stream matching run history oldest first as NDJSON"""
+    filters = (type, status, _to_db_time(since), _to_db_time(until))
+
+    async def rows() -> AsyncGenerator[str, None]:
+        after_id = 0
+        while True:
+            page = await db_read(
+                get_run_history_after, after_id, EXPORT_PAGE_SIZE, *filters
+            )
+            if not page:
+                return
+            yield "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in page)
+            after_id = page[-1]["id"]
+
+    return StreamingResponse(
+        rows(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=run_history.ndjson"},
+    )
+
+
+@router.get("/history/summary", response_model=List[dict])
+async def get_history_summary() -> List[dict]:
+    """Get daily counts of run history removed by retention"""
+    try:
+        return await db_read(get_run_history_rollup)
+    except Exception as e:
+        logger.error(f"Error getting history summary: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/rate-limits", response_model=Dict[str, float])
+async def get_rate_limits() -> Dict[str, float]:
+    """Get current send rate per target chat (sends per minute)"""
+    return get_send_rates()
+
+
+@router.get("/price-cache", response_model=Dict[str, int])
+async def get_price_cache() -> Dict[str, int]:
+    """Get price cache hit/miss counters"""
+    return get_price_cache_stats()
+
+
+@router.get("/duplicates", response_model=dict)
+async def get_duplicates() -> dict:
+    """Get number of suppressed duplicate posts, total and per source channel"""
+    counts = await db_read(get_duplicate_counts)
+    return {"total": sum(counts.values()), "by_channel": counts}
+
+
+@router.get("/poll-rates", response_model=List[dict])
+async def get_poll_rates() -> List[dict]:
+    """Get learned posting rate and poll interval per source channel"""
+    config = get_config()
+    channel_runs = await db_read(get_channel_runs)
+    due_times = await get_channel_due_times(config)
+    rates = []
+    for channel in config.source_channels:
+        state = channel_runs.get(channel, {})
+        base_minutes = get_channel_schedule(config, channel).interval_minutes
+        rates.append(
+            {
+                "channel": channel,
+                "rate_per_hour": round(state.get("rate_per_hour", 0.0), 2),
+                "interval_seconds": effective_interval(
+                    state, base_minutes or config.interval_minutes
+                ),
+                "last_run_at": state.get("last_run_at"),
+                "next_due_at": due_times[channel].strftime("%Y-%m-%d %H:%M:%S"),
+            }
+        )
+    return rates
+
 
 @router.post("/reset", response_model=MessageResponse)
 async def reset_database() -> MessageResponse:
     """Reset database (except config)"""
     try:
-        from ..db import reset_db_except_config
-
-        reset_db_except_config()
+        await db_write(reset_db_except_config)
+        await refresh_status_snapshot()
         return MessageResponse(
             status="success", message="Veritabanı başarıyla sıfırlandı (ayarlar hariç)"
         )
@@ -159,7 +285,18 @@ async def login_bot(request: PhoneCodeRequest) -> MessageResponse:
     """Login bot with phone code"""
     try:
         await login_bot_with_code(request.code)
+        wake_scheduler()
         return MessageResponse(status="success", message="Bot başarıyla giriş yaptı")
     except Exception as e:
         logger.error(f"Error logging in bot: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/process", response_model=MessageResponse)
+async def process_now() -> MessageResponse:
+    """Trigger a run now, without waiting for the interval"""
+    if not get_config().is_active:
+        raise HTTPException(status_code=400, detail="Bot aktif değil")
+
+    request_run()
+    return MessageResponse(status="success", message="Çalıştırma başlatıldı")
@@ -0,0 +1,109 @@
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, List, Tuple, TypeVar
+from .db import run_write_batch
+from .logger import logger
+from .metrics import DB_CALL_SECONDS
+from .settings import DB_READ_POOL_SIZE, DB_WRITE_BATCH_SIZE
+
+T = TypeVar("T")
+
+WriteJob = Tuple[Callable[[], Any], "Future[Any]"]
+
+# Reads run on a small pool, writes on one thread that group-commits them
+_read_pool: ThreadPoolExecutor | None = None
+_write_queue: "queue.Queue[WriteJob | None]" = queue.Queue()
+_writer_thread: threading.Thread | None = None
+_start_lock = threading.Lock()
+
+
+def _drain_jobs(first: WriteJob) -> Tuple[List[WriteJob], bool]:
+    """Collect queued write jobs behind the first one, up to the batch size"""
+    jobs = [first]
+    while len(jobs) < max(DB_WRITE_BATCH_SIZE, 1):
+        try:
+            job = _write_queue.get_nowait()
+        except queue.Empty:
+            break
+        if job is None:
+            return jobs, True
+        jobs.append(job)
+    return jobs, False
+
+
+def _writer_loop() -> None:
+    """Run queued writes in group commits until stopped"""
+    stopping = False
+    while not stopping:
+        first = _write_queue.get()
+        if first is None:
+            return
+        jobs, stopping = _drain_jobs(first)
+
+        try:
+            results = run_write_batch([job for job, _ in jobs])
+        except Exception as e:
+            logger.error(f"Database write batch failed: {e}")
+            results = [(False, e)] * len(jobs)
+
+        for (_, future), (ok, value) in zip(jobs, results):
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+
+def _timed(kind: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run database function, recording its duration"""
+    with DB_CALL_SECONDS.time(operation=func.__name__, kind=kind):
+        return func(*args, **kwargs)
+
+
+def _ensure_started() -> ThreadPoolExecutor:
+    """Start the writer thread and read pool on first use"""
+    global _read_pool, _writer_thread
+
+    with _start_lock:
+        if _writer_thread is None or not _writer_thread.is_alive():
+            _writer_thread = threading.Thread(
+                target=_writer_loop, name="db-writer", daemon=True
+            )
+            _writer_thread.start()
+        if _read_pool is None:
+            _read_pool = ThreadPoolExecutor(
+                max_workers=max(DB_READ_POOL_SIZE, 1), thread_name_prefix="db-reader"
+            )
+        return _read_pool
+
+
+async def db_read(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a read-only database function on the read pool"""
+    read_pool = _ensure_started()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        read_pool, partial(_timed, "read", func, *args, **kwargs)
+    )
+
+
+async def db_write(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a database write on the writer thread as part of a group commit"""
+    _ensure_started()
+    future: "Future[T]" = Future()
+    _write_queue.put((partial(_timed, "write", func, *args, **kwargs), future))
+    return await asyncio.wrap_future(future)
+
+
+async def stop_db_workers() -> None:
+    """Flush pending writes and stop the writer thread and read pool"""
+    global _read_pool, _writer_thread
+
+    if _writer_thread is not None:
+        _write_queue.put(None)
+        await asyncio.to_thread(_writer_thread.join)
+        _writer_thread = None
+    if _read_pool is not None:
+        _read_pool.shutdown(wait=True)
+        _read_pool = None
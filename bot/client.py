@@ -1,22 +1,148 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, TypeVar
 from telethon import TelegramClient
-from telethon.errors import SessionPasswordNeededError, PhoneCodeExpiredError
+from telethon.errors import (
+    AuthKeyError,
+    FloodWaitError,
+    PhoneCodeExpiredError,
+    SessionPasswordNeededError,
+    UnauthorizedError,
+)
 from .config import get_config
 from .logger import logger
 from fastapi import HTTPException
+from .async_db import db_read, db_write
 from .db import save_phone_code_hash, get_phone_code_hash, clear_phone_code_hash
+from .settings import (
+    AUTH_CACHE_TTL_SECONDS,
+    CLIENT_RECONNECT_ATTEMPTS,
+    CLIENT_RECONNECT_BASE_DELAY,
+    CLIENT_RECONNECT_MAX_DELAY,
+    FLOOD_WAIT_MAX_SLEEP_SECONDS,
+)
 
+T = TypeVar("T")
+
+# Process-wide client shared by the scheduler and the API routes
 _client_instance: TelegramClient | None = None
+_client_credentials: tuple[int, str] | None = None
+_client_lock = asyncio.Lock()
+_connection_epoch = 0
+
+# Cached result of the last authorization check
+_auth_state: bool | None = None
+_auth_checked_at: float = 0.0
+
+# Until when Telegram asked us to stop fetching (monotonic time)
+_flood_wait_until = 0.0
 
 
 def _create_client() -> TelegramClient:
     """Create new Telegram client instance"""
     config = get_config()
-    return TelegramClient("message_bot", config.api_id, config.api_hash)
+    # Raise every FloodWait instead of sleeping through short ones, so the
+    # send rate limiter learns from all of them
+    return TelegramClient(
+        "message_bot", config.api_id, config.api_hash, flood_sleep_threshold=0
+    )
+
+
+async def _connect_with_backoff(client: TelegramClient) -> None:
+    """Connect client, retrying with exponential backoff"""
+    global _connection_epoch
+
+    delay = CLIENT_RECONNECT_BASE_DELAY
+    for attempt in range(1, CLIENT_RECONNECT_ATTEMPTS + 1):
+        try:
+            await client.connect()
+            _connection_epoch += 1
+            return
+        except OSError as e:
+            if attempt == CLIENT_RECONNECT_ATTEMPTS:
+                raise
+            logger.warning(
+                f"Telegram connection failed (attempt {attempt}): {e}, "
+                f"retrying in {delay}s"
+            )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, CLIENT_RECONNECT_MAX_DELAY)
+
+
+def get_connection_epoch() -> int:
+    """Get number of connections made by the shared client manager"""
+    return _connection_epoch
+
+
+def invalidate_auth_cache() -> None:
+    """Forget cached authorization state so the next check hits Telegram"""
+    global _auth_state
+    _auth_state = None
+
+
+def handle_client_error(error: Exception) -> None:
+    """Invalidate cached authorization state on session loss errors"""
+    if isinstance(error, (UnauthorizedError, AuthKeyError)):
+        logger.warning(f"Telegram session lost: {error}")
+        invalidate_auth_cache()
+
+
+def flood_wait_remaining() -> float:
+    """Get seconds left of the last flood wait that was too long to sleep"""
+    return max(_flood_wait_until - time.monotonic(), 0.0)
+
+
+def _note_flood_wait(seconds: int) -> None:
+    """Remember a flood wait that is left to the caller's retry"""
+    global _flood_wait_until
+    _flood_wait_until = max(_flood_wait_until, time.monotonic() + seconds)
+
+
+async def with_flood_wait(call: Callable[[], Awaitable[T]]) -> T:
+    """Run Telegram request, sleeping once through a short flood wait"""
+    try:
+        return await call()
+    except FloodWaitError as e:
+        if e.seconds > FLOOD_WAIT_MAX_SLEEP_SECONDS:
+            _note_flood_wait(e.seconds)
+            raise
+        logger.warning(f"Flood wait of {e.seconds}s, sleeping before retrying")
+        await asyncio.sleep(e.seconds)
+
+    try:
+        return await call()
+    except FloodWaitError as e:
+        _note_flood_wait(e.seconds)
+        raise
+
+
+async def _get_connected_client() -> TelegramClient:
+    """Get shared Telegram client, connecting it if necessary"""
+    global _client_instance, _client_credentials
+
+    async with _client_lock:
+        config = get_config()
+        credentials = (config.api_id, config.api_hash)
+
+        if _client_instance and _client_credentials != credentials:
+            logger.info("Telegram API credentials changed, recreating client")
+            await _client_instance.disconnect()
+            _client_instance = None
+            invalidate_auth_cache()
+
+        if not _client_instance:
+            _client_instance = _create_client()
+            _client_credentials = credentials
+
+        if not _client_instance.is_connected():
+            await _connect_with_backoff(_client_instance)
+
+        return _client_instance
 
 
 async def _handle_sign_in(client: TelegramClient, phone_code: str) -> None:
     """Handle sign in process"""
-    phone_code_hash = get_phone_code_hash()
+    phone_code_hash = await db_read(get_phone_code_hash)
     if not phone_code_hash:
         raise HTTPException(status_code=400, detail="Please request code first")
 
@@ -28,7 +154,7 @@ async def _handle_sign_in(client: TelegramClient, phone_code: str) -> None:
             phone_code_hash=phone_code_hash,
         )
     except PhoneCodeExpiredError:
-        clear_phone_code_hash()
+        await db_write(clear_phone_code_hash)
         raise HTTPException(
             status_code=400, detail="Code expired, please request new code"
         )
@@ -45,23 +171,26 @@ async def _request_code(client: TelegramClient) -> None:
     """Request verification code"""
     config = get_config()
     result = await client.send_code_request(config.phone_number, force_sms=True)
-    save_phone_code_hash(result.phone_code_hash)
+    await db_write(save_phone_code_hash, result.phone_code_hash)
     logger.info(f"Please check your Telegram app on {config.phone_number}")
 
 
 async def is_bot_logged() -> bool:
-    """Check if bot is logged in by looking for session file"""
-    try:
-        client = _create_client()
-        try:
-            await client.connect()
-            is_logged = await client.is_user_authorized()
-            await client.disconnect()
-            return is_logged
-        except Exception as e:
-            logger.error(f"Error checking session: {e}")
-            return False
+    """Check if bot is logged in, using the cached state while it is fresh"""
+    global _auth_state, _auth_checked_at
+
+    if (
+        _auth_state is not None
+        and time.monotonic() - _auth_checked_at < AUTH_CACHE_TTL_SECONDS
+    ):
+        return _auth_state
 
+    try:
+        client = await _get_connected_client()
+        is_logged = await client.is_user_authorized()
+        _auth_state = is_logged
+        _auth_checked_at = time.monotonic()
+        return is_logged
     except Exception as e:
         logger.error(f"Error checking bot login status: {e}")
         return False
@@ -69,37 +198,40 @@ async def is_bot_logged() -> bool:
 
 async def send_login_code() -> None:
     """Send login code to bot"""
-    global _client_instance
-
     if await is_bot_logged():
         return
 
-    if not _client_instance:
-        _client_instance = _create_client()
-        await _client_instance.connect()
-
-    await _request_code(_client_instance)
+    client = await _get_connected_client()
+    await _request_code(client)
 
 
 async def login_bot_with_code(phone_code: str) -> None:
     """Login bot with phone code"""
-    global _client_instance
-
-    if not _client_instance:
-        raise Exception("Please send code first")
-
-    await _handle_sign_in(_client_instance, phone_code)
-    clear_phone_code_hash()
-    await _client_instance.disconnect()
-    _client_instance = None
+    client = await _get_connected_client()
+    try:
+        await _handle_sign_in(client, phone_code)
+    finally:
+        invalidate_auth_cache()
+    await db_write(clear_phone_code_hash)
 
 
 async def get_client() -> TelegramClient:
-    """Get Telegram client instance"""
+    """Get shared, authorized Telegram client"""
+    client = await _get_connected_client()
 
     if not await is_bot_logged():
         raise Exception("Please login first")
 
-    client = _create_client()
-    await client.connect()
     return client
+
+
+async def disconnect_client() -> None:
+    """Disconnect shared Telegram client"""
+    global _client_instance, _client_credentials
+
+    async with _client_lock:
+        if _client_instance:
+            await _client_instance.disconnect()
+        _client_instance = None
+        _client_credentials = None
+        invalidate_auth_cache()
@@ -1,6 +1,22 @@
-from typing import List
+import time
+from typing import Callable, Dict, Final, List
 from pydantic import BaseModel, Field
 from .db import get_config as get_db_config
+from .db import get_config_version
+from .logger import logger
+
+
+class ChannelSchedule(BaseModel):
+    """Per-channel schedule overriding the global interval"""
+
+    interval_minutes: int | None = Field(
+        description="Run interval in minutes, global interval when empty",
+        default=None,
+        ge=1,
+    )
+    priority: int = Field(
+        description="Channels with higher priority are processed first", default=0
+    )
 
 
 class BotConfig(BaseModel):
@@ -16,6 +32,12 @@ class BotConfig(BaseModel):
     gemini_api_key: str = Field(description="Gemini API key for price parsing")
     is_active: bool = Field(description="Bot active status", default=True)
     interval_minutes: int = Field(description="Run interval in minutes", default=60)
+    realtime_mode: bool = Field(
+        description="Forward new messages as they arrive", default=False
+    )
+    channel_schedules: Dict[str, ChannelSchedule] = Field(
+        description="Per-channel interval and priority", default_factory=dict
+    )
 
     class Config:
         """Pydantic model configuration"""
@@ -24,19 +46,66 @@ class BotConfig(BaseModel):
         frozen = True
 
 
+# The version is polled at most this often so get_config stays off SQLite on
+# hot paths; in-process writes reload immediately with force=True
+CONFIG_VERSION_CHECK_SECONDS: Final[float] = 1.0
+
 _config_instance: BotConfig | None = None
+_config_version = -1
+_version_checked_at = 0.0
+
+# Called with the new configuration after it changed
+_subscribers: List[Callable[[BotConfig], None]] = []
+
+
+def subscribe_config(callback: Callable[[BotConfig], None]) -> None:
+    """Register callback run on the event loop when configuration changes"""
+    if callback not in _subscribers:
+        _subscribers.append(callback)
+
+
+def _notify_subscribers(config: BotConfig) -> None:
+    """Run config change callbacks"""
+    for callback in _subscribers:
+        try:
+            callback(config)
+        except Exception as e:
+            logger.error(f"Error in config subscriber: {e}")
+
+
+def get_channel_schedule(config: BotConfig, channel: str) -> ChannelSchedule:
+    """Get effective interval and priority of a channel"""
+    schedule = config.channel_schedules.get(channel)
+    return ChannelSchedule(
+        interval_minutes=(schedule and schedule.interval_minutes)
+        or config.interval_minutes,
+        priority=schedule.priority if schedule else 0,
+    )
 
 
 def get_config(force: bool = False) -> BotConfig:
     """
-    Get bot configuration
+    Get bot configuration, reloaded when the config version changed
+
+    The version is checked at most every CONFIG_VERSION_CHECK_SECONDS.
 
     Args:
         force: Force reload configuration from database
     """
-    global _config_instance
+    global _config_instance, _config_version, _version_checked_at
+
+    now = time.monotonic()
+    if (
+        _config_instance is not None
+        and not force
+        and now - _version_checked_at < CONFIG_VERSION_CHECK_SECONDS
+    ):
+        return _config_instance
 
-    if _config_instance is None or force:
+    _version_checked_at = now
+    version = get_config_version()
+    if _config_instance is None or force or version != _config_version:
+        previous = _config_instance
         db_config = get_db_config()
         _config_instance = BotConfig(
             admin_password=db_config.admin_password,
@@ -49,6 +118,15 @@ def get_config(force: bool = False) -> BotConfig:
             gemini_api_key=db_config.gemini_api_key,
             is_active=db_config.is_active,
             interval_minutes=db_config.interval_minutes,
+            realtime_mode=db_config.realtime_mode,
+            channel_schedules={
+                channel: ChannelSchedule.model_validate(schedule)
+                for channel, schedule in db_config.channel_schedules.items()
+            },
         )
+        _config_version = version
+
+        if previous is not None and previous != _config_instance:
+            _notify_subscribers(_config_instance)
 
     return _config_instance
@@ -1,16 +1,30 @@
 import datetime
 import sqlite3
-from typing import Any, Generator, List
+import threading
+from typing import Any, Callable, Dict, Generator, List, Tuple
 from contextlib import contextmanager
 import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from .logger import logger
 import os
-from .settings import DEFAULT_CONFIG
+from .settings import (
+    DB_CACHE_SIZE_KB,
+    DB_JOURNAL_MODE,
+    DB_STATEMENT_CACHE_SIZE,
+    DEFAULT_CONFIG,
+)
 
 # Database path
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "bot.db")
 
+# One persistent connection per thread
+_local = threading.local()
+_connections: List[sqlite3.Connection] = []
+_connections_lock = threading.Lock()
+
+# Latest run_history entry per type, mirrored from the last_runs table
+_last_runs: Dict[str, dict] = {}
+
 
 @dataclass
 class Config:
@@ -26,24 +40,177 @@ class Config:
     gemini_api_key: str
     is_active: bool = True
     interval_minutes: int = 60
+    realtime_mode: bool = False
+    channel_schedules: Dict[str, dict] = field(default_factory=dict)
 
 
-@contextmanager
-def get_db() -> Generator[sqlite3.Connection, None, None]:
-    """Database connection context manager"""
+@dataclass
+class OutboxItem:
+    """Prepared post waiting in the outbox"""
+
+    idempotency_key: str
+    channel_id: str
+    target_channel: str
+    text: str
+    media: List[dict]
+    source_message_ids: List[int]
+    id: int = 0
+    attempts: int = 0
+    next_attempt_at: str = ""
+
+
+def _connect() -> sqlite3.Connection:
+    """Open connection with tuned pragmas"""
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(
+        DB_PATH,
+        timeout=30,
+        check_same_thread=False,
+        cached_statements=DB_STATEMENT_CACHE_SIZE,
+    )
     conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA journal_mode={DB_JOURNAL_MODE}")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute(f"PRAGMA cache_size=-{DB_CACHE_SIZE_KB}")
+    return conn
+
+
+@contextmanager
+def get_db() -> Generator[sqlite3.Connection, None, None]:
+    """Database connection context manager using the thread's connection"""
+    conn: sqlite3.Connection | None = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "path", None) != DB_PATH:
+        conn = _connect()
+        _local.conn = conn
+        _local.path = DB_PATH
+        with _connections_lock:
+            _connections.append(conn)
+
     try:
         yield conn
-    finally:
-        conn.close()
+    except Exception:
+        # Never leave a half-done transaction on the shared connection,
+        # inside a write batch the failed job's savepoint is rolled back instead
+        if conn.in_transaction and not getattr(_local, "batching", False):
+            conn.rollback()
+        raise
+
+
+def _commit(conn: sqlite3.Connection) -> None:
+    """Commit unless a write batch will commit for the whole group"""
+    if not getattr(_local, "batching", False):
+        conn.commit()
+
+
+def _after_commit(
+    conn: sqlite3.Connection, action: Callable[[sqlite3.Connection], None]
+) -> None:
+    """Run action now, or once the running transaction or batch has committed"""
+    if getattr(_local, "batching", False):
+        _local.after_commit.append(action)
+    else:
+        action(conn)
+
+
+def _run_after_commit(conn: sqlite3.Connection) -> None:
+    """Run actions deferred until the transaction committed"""
+    actions, _local.after_commit = _local.after_commit, []
+    for action in actions:
+        try:
+            action(conn)
+        except sqlite3.Error as e:
+            logger.error(f"Error running post-commit database action: {e}")
+
+
+@contextmanager
+def _transaction() -> Generator[sqlite3.Connection, None, None]:
+    """Group nested db calls into one commit, or into the running write batch"""
+    with get_db() as conn:
+        if getattr(_local, "batching", False):
+            yield conn
+            return
+
+        _local.batching = True
+        _local.after_commit = []
+        try:
+            yield conn
+        finally:
+            _local.batching = False
+        conn.commit()
+        _run_after_commit(conn)
+
+
+def run_write_batch(jobs: List[Callable[[], Any]]) -> List[Tuple[bool, Any]]:
+    """Run write jobs in one group commit, isolating failures with savepoints"""
+    results: List[Tuple[bool, Any]] = []
+    with get_db() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        _local.batching = True
+        _local.after_commit = []
+        try:
+            for job in jobs:
+                conn.execute("SAVEPOINT job")
+                actions = len(_local.after_commit)
+                try:
+                    result = job()
+                except Exception as e:
+                    conn.execute("ROLLBACK TO job")
+                    # Rolled back writes must not update in-memory state
+                    del _local.after_commit[actions:]
+                    results.append((False, e))
+                else:
+                    results.append((True, result))
+                conn.execute("RELEASE job")
+        finally:
+            _local.batching = False
+        conn.commit()
+        _run_after_commit(conn)
+    return results
+
+
+def close_db() -> None:
+    """Close all persistent connections, checkpointing the WAL"""
+    with _connections_lock:
+        for conn in _connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.error(f"Error closing database connection: {e}")
+        _connections.clear()
+    _local.__dict__.clear()
+
+
+def _enable_incremental_vacuum(conn: sqlite3.Connection) -> None:
+    """Switch database to incremental auto-vacuum (one-time rebuild)"""
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+        return
+    logger.info("Enabling incremental auto-vacuum")
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    conn.execute("VACUUM")
+
+
+def _incremental_vacuum(conn: sqlite3.Connection) -> None:
+    """Return all free pages to the filesystem"""
+    # execute() steps the pragma once, freeing a single page; executescript
+    # runs it to completion (and needs no transaction to be open)
+    conn.executescript("PRAGMA incremental_vacuum;")
+
+
+def _add_column(conn: sqlite3.Connection, table: str, column: str, ddl: str) -> None:
+    """Add column to an existing table unless it is already there"""
+    columns = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
 
 
 def init_db() -> None:
     """Initialize database with tables"""
     logger.info(f"Initializing database at {DB_PATH}")
     with get_db() as conn:
+        _enable_incremental_vacuum(conn)
+
         # Config table
         conn.execute("""
         CREATE TABLE IF NOT EXISTS config (
@@ -53,6 +220,23 @@ def init_db() -> None:
         )
         """)
 
+        # Version bumped by triggers on every config change
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS config_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+        """)
+        conn.execute("INSERT OR IGNORE INTO config_version (id, version) VALUES (1, 0)")
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS config_version_on_{event.lower()}
+            AFTER {event} ON config
+            BEGIN
+                UPDATE config_version SET version = version + 1 WHERE id = 1;
+            END
+            """)
+
         # Last message table
         conn.execute("""
         CREATE TABLE IF NOT EXISTS last_messages (
@@ -72,6 +256,139 @@ def init_db() -> None:
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
         """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_run_history_type_created_at "
+            "ON run_history (type, created_at)"
+        )
+        # Keyset pagination on id, optionally filtered by type or status
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_run_history_type_id "
+            "ON run_history (type, id)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_run_history_status_id "
+            "ON run_history (status, id)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_run_history_created_at "
+            "ON run_history (created_at)"
+        )
+
+        # Latest run per type, kept so status checks never scan run_history
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS last_runs (
+            type TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            message TEXT NOT NULL,
+            created_at TIMESTAMP NOT NULL
+        )
+        """)
+        conn.execute("""
+        INSERT OR IGNORE INTO last_runs (type, status, message, created_at)
+        SELECT type, status, message, created_at
+        FROM run_history AS r
+        WHERE id = (
+            SELECT id FROM run_history
+            WHERE type = r.type
+            ORDER BY created_at DESC, id DESC
+            LIMIT 1
+        )
+        """)
+
+        # When each source channel was last swept by the scheduler
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS channel_state (
+            channel_id TEXT PRIMARY KEY,
+            last_run_at TIMESTAMP NOT NULL
+        )
+        """)
+        # Learned arrival rate and poll interval for adaptive polling
+        _add_column(conn, "channel_state", "rate_per_hour", "REAL NOT NULL DEFAULT 0")
+        _add_column(conn, "channel_state", "interval_seconds", "INTEGER")
+
+        # Daily counts of run_history entries removed by retention
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS run_history_rollup (
+            day TEXT NOT NULL,
+            type TEXT NOT NULL,
+            status TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (day, type, status)
+        )
+        """)
+
+        # Outbox of prepared posts waiting to be sent
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            idempotency_key TEXT NOT NULL UNIQUE,
+            channel_id TEXT NOT NULL,
+            target_channel TEXT NOT NULL,
+            text TEXT NOT NULL,
+            media TEXT NOT NULL,
+            source_message_ids TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            next_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_outbox_status ON outbox (status, id)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_outbox_status_channel "
+            "ON outbox (status, channel_id, id)"
+        )
+
+        # Fingerprints of sent posts used to skip cross-channel reposts
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS post_fingerprints (
+            fingerprint TEXT PRIMARY KEY,
+            outbox_id INTEGER NOT NULL,
+            channel_id TEXT NOT NULL,
+            seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+
+        # Suppressed duplicates per source channel, outliving outbox pruning
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS duplicate_counts (
+            channel_id TEXT PRIMARY KEY,
+            count INTEGER NOT NULL DEFAULT 0
+        )
+        """)
+        conn.execute("""
+        INSERT OR IGNORE INTO duplicate_counts (channel_id, count)
+        SELECT channel_id, COUNT(*) FROM outbox
+        WHERE status = 'duplicate'
+        GROUP BY channel_id
+        """)
+
+        # Raw prices extracted by Gemini, keyed by normalized text hash
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS price_cache (
+            key TEXT PRIMARY KEY,
+            price TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_price_cache_created_at "
+            "ON price_cache (created_at)"
+        )
+
+        # Resolved Telegram peers of configured channels, keyed by username
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS peer_cache (
+            username TEXT PRIMARY KEY,
+            peer_id INTEGER NOT NULL,
+            access_hash INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
 
         conn.execute(
             """
@@ -83,17 +400,14 @@ def init_db() -> None:
             """
         )
 
-        conn.commit()
+        _commit(conn)
     logger.info("Database tables created successfully")
 
 
 def get_db_now() -> datetime.datetime:
-    """Get current time from database"""
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT CURRENT_TIMESTAMP")
-        row = cursor.fetchone()
-        return datetime.datetime.strptime(row["CURRENT_TIMESTAMP"], "%Y-%m-%d %H:%M:%S")
+    """Get current UTC time as stored by CURRENT_TIMESTAMP"""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return now.replace(tzinfo=None, microsecond=0)
 
 
 def try_parse_config(value: str) -> Any:
@@ -124,9 +438,18 @@ def get_config() -> Config:
             gemini_api_key=config_dict.get("gemini_api_key", ""),
             is_active=config_dict.get("is_active", True),
             interval_minutes=config_dict.get("interval_minutes", 60),
+            realtime_mode=config_dict.get("realtime_mode", False),
+            channel_schedules=config_dict.get("channel_schedules", {}),
         )
 
 
+def get_config_version() -> int:
+    """Get version of the config table, changes on every config write"""
+    with get_db() as conn:
+        row = conn.execute("SELECT version FROM config_version WHERE id = 1").fetchone()
+        return row["version"] if row else 0
+
+
 def update_config(key: str, value: Any) -> None:
     """Update configuration in database"""
     with get_db() as conn:
@@ -135,12 +458,26 @@ def update_config(key: str, value: Any) -> None:
             INSERT OR REPLACE INTO config (key, value, updated_at)
             VALUES (?, ?, CURRENT_TIMESTAMP)
             """,
-            (key, json.dumps(value) if isinstance(value, list) else value),
+            (key, json.dumps(value) if isinstance(value, (list, dict)) else value),
         )
-        conn.commit()
+        _commit(conn)
         logger.info(f"Updated config: {key}")
 
 
+def update_configs(values: Dict[str, Any]) -> None:
+    """Update multiple JSON-encoded configuration values in one transaction"""
+    with get_db() as conn:
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO config (key, value, updated_at)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+            """,
+            [(key, json.dumps(value)) for key, value in values.items()],
+        )
+        _commit(conn)
+        logger.info(f"Updated config: {', '.join(values)}")
+
+
 def is_config_empty() -> bool:
     """Check if config table is empty"""
     with get_db() as conn:
@@ -184,57 +521,590 @@ def update_last_message_id(channel: str, message_id: int) -> None:
             """,  # noqa: E501
             (channel, message_id),
         )
-        conn.commit()
+        _commit(conn)
         logger.info(f"Updated last message ID for channel {channel}: {message_id}")
 
 
+def get_channel_checkpoints() -> dict[str, dict]:
+    """Get last processed message ID and update time per channel"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT channel_id, last_message_id, updated_at FROM last_messages"
+        )
+        return {
+            row["channel_id"]: {
+                "last_message_id": row["last_message_id"],
+                "updated_at": row["updated_at"],
+            }
+            for row in cursor.fetchall()
+        }
+
+
+def enqueue_outbox(channel: str, items: List[OutboxItem], message_id: int) -> int:
+    """Enqueue prepared posts and advance channel checkpoint in one transaction"""
+    with get_db() as conn:
+        inserted = 0
+        for item in items:
+            cursor = conn.execute(
+                """
+                INSERT OR IGNORE INTO outbox (
+                    idempotency_key, channel_id, target_channel, text, media,
+                    source_message_ids
+                )
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    item.idempotency_key,
+                    item.channel_id,
+                    item.target_channel,
+                    item.text,
+                    json.dumps(item.media),
+                    json.dumps(item.source_message_ids),
+                ),
+            )
+            inserted += cursor.rowcount
+
+        # Never move back, a concurrent run may already be further ahead
+        conn.execute(
+            """
+            INSERT INTO last_messages (channel_id, last_message_id, updated_at)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT (channel_id) DO UPDATE SET
+                last_message_id = MAX(last_message_id, excluded.last_message_id),
+                updated_at = excluded.updated_at
+            """,
+            (channel, message_id),
+        )
+        _commit(conn)
+        logger.info(
+            f"Enqueued {inserted} posts for channel {channel}, "
+            f"last message ID: {message_id}"
+        )
+        return inserted
+
+
+def get_channel_runs() -> dict[str, dict]:
+    """Get last sweep time, arrival rate and poll interval per channel"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT channel_id, last_run_at, rate_per_hour, interval_seconds
+            FROM channel_state
+            """
+        )
+        return {row["channel_id"]: dict(row) for row in cursor.fetchall()}
+
+
+def get_channel_run(channel: str) -> dict | None:
+    """Get last sweep time, arrival rate and poll interval of a channel"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT channel_id, last_run_at, rate_per_hour, interval_seconds
+            FROM channel_state
+            WHERE channel_id = ?
+            """,
+            (channel,),
+        )
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
+
+def save_channel_runs(runs: List[Tuple[str, float, int]]) -> None:
+    """Record channels as swept now with their learned rate and interval"""
+    with get_db() as conn:
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO channel_state (
+                channel_id, last_run_at, rate_per_hour, interval_seconds
+            )
+            VALUES (?, CURRENT_TIMESTAMP, ?, ?)
+            """,
+            runs,
+        )
+        _commit(conn)
+
+
+def save_run(
+    outbox: Dict[str, Tuple[List[OutboxItem], int]],
+    history: List[Tuple[str, str, str]],
+    channel_runs: List[Tuple[str, float, int]] | None = None,
+) -> None:
+    """Save a run's outbox items, checkpoints, history and swept channels"""
+    with _transaction():
+        for channel, (items, message_id) in outbox.items():
+            enqueue_outbox(channel, items, message_id)
+        for status, message, type in history:
+            add_run_history(status, message, type)
+        if channel_runs:
+            save_channel_runs(channel_runs)
+
+
+def get_due_outbox_heads(limit: int = 50) -> List[OutboxItem]:
+    """Get the oldest pending item of each channel, if it is due, oldest first"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        # Only a channel's head may be sent, so a backlog or a head waiting
+        # for its retry never hides other channels' items
+        cursor.execute(
+            """
+            SELECT id, idempotency_key, channel_id, target_channel, text, media,
+                   source_message_ids, attempts, next_attempt_at
+            FROM outbox
+            WHERE id IN (
+                SELECT MIN(id) FROM outbox
+                WHERE status = 'pending'
+                GROUP BY channel_id
+            )
+              AND next_attempt_at <= datetime('now')
+            ORDER BY id
+            LIMIT ?
+            """,
+            (limit,),
+        )
+        return [
+            OutboxItem(
+                id=row["id"],
+                idempotency_key=row["idempotency_key"],
+                channel_id=row["channel_id"],
+                target_channel=row["target_channel"],
+                text=row["text"],
+                media=json.loads(row["media"]),
+                source_message_ids=json.loads(row["source_message_ids"]),
+                attempts=row["attempts"],
+                next_attempt_at=row["next_attempt_at"],
+            )
+            for row in cursor.fetchall()
+        ]
+
+
+def claim_outbox_item(item_id: int) -> bool:
+    """Mark pending outbox item as being sent, return False if already taken"""
+    with get_db() as conn:
+        cursor = conn.execute(
+            """
+            UPDATE outbox
+            SET status = 'sending', updated_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND status = 'pending'
+            """,
+            (item_id,),
+        )
+        _commit(conn)
+        return cursor.rowcount == 1
+
+
+def mark_outbox_sent(item_id: int) -> None:
+    """Mark outbox item as sent"""
+    with get_db() as conn:
+        conn.execute(
+            """
+            UPDATE outbox
+            SET status = 'sent', attempts = attempts + 1,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,
+            (item_id,),
+        )
+        _commit(conn)
+
+
+def mark_outbox_failed(
+    item_id: int, error: str, retry_in_seconds: int, max_attempts: int
+) -> None:
+    """Record failed send, scheduling a retry until max attempts is reached"""
+    with get_db() as conn:
+        conn.execute(
+            """
+            UPDATE outbox
+            SET status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END,
+                attempts = attempts + 1,
+                last_error = ?,
+                next_attempt_at = datetime('now', ?),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,  # noqa: E501
+            (max_attempts, error, f"+{retry_in_seconds} seconds", item_id),
+        )
+        # An unsent post must not suppress its copies from other channels
+        conn.execute("DELETE FROM post_fingerprints WHERE outbox_id = ?", (item_id,))
+        _commit(conn)
+
+
+def mark_outbox_duplicate(item_id: int) -> None:
+    """Mark outbox item as suppressed duplicate"""
+    with get_db() as conn:
+        conn.execute(
+            """
+            UPDATE outbox
+            SET status = 'duplicate', updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,
+            (item_id,),
+        )
+        conn.execute(
+            """
+            INSERT INTO duplicate_counts (channel_id, count)
+            SELECT channel_id, 1 FROM outbox WHERE id = ?
+            ON CONFLICT (channel_id) DO UPDATE SET count = count + 1
+            """,
+            (item_id,),
+        )
+        _commit(conn)
+
+
+def claim_post_fingerprint(
+    fingerprint: str, outbox_id: int, channel: str, window_minutes: int
+) -> bool:
+    """Record post fingerprint, return False if another post had it recently"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT outbox_id FROM post_fingerprints
+            WHERE fingerprint = ? AND seen_at >= datetime('now', ?)
+            """,
+            (fingerprint, f"-{window_minutes} minutes"),
+        )
+        row = cursor.fetchone()
+        if row and row["outbox_id"] != outbox_id:
+            return False
+
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO post_fingerprints (
+                fingerprint, outbox_id, channel_id, seen_at
+            )
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            """,
+            (fingerprint, outbox_id, channel),
+        )
+        conn.execute(
+            "DELETE FROM post_fingerprints WHERE seen_at < datetime('now', ?)",
+            (f"-{window_minutes} minutes",),
+        )
+        _commit(conn)
+        return True
+
+
+def get_duplicate_counts() -> dict[str, int]:
+    """Get number of suppressed duplicate posts per source channel"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT channel_id, count FROM duplicate_counts")
+        return {row["channel_id"]: row["count"] for row in cursor.fetchall()}
+
+
+def release_outbox_item(item_id: int) -> None:
+    """Put claimed outbox item back to pending without counting an attempt"""
+    with get_db() as conn:
+        conn.execute(
+            """
+            UPDATE outbox
+            SET status = 'pending', updated_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND status = 'sending'
+            """,
+            (item_id,),
+        )
+        _commit(conn)
+
+
+def requeue_interrupted_outbox() -> None:
+    """Return items left in sending state by a crash to pending"""
+    with get_db() as conn:
+        cursor = conn.execute(
+            """
+            UPDATE outbox
+            SET status = 'pending', updated_at = CURRENT_TIMESTAMP
+            WHERE status = 'sending'
+            """
+        )
+        _commit(conn)
+        if cursor.rowcount:
+            logger.info(f"Requeued {cursor.rowcount} interrupted outbox items")
+
+
+def prune_outbox(days: int) -> None:
+    """Delete sent and suppressed outbox items older than given days"""
+    with get_db() as conn:
+        conn.execute(
+            """
+            DELETE FROM outbox
+            WHERE status IN ('sent', 'duplicate')
+              AND updated_at < datetime('now', ?)
+            """,
+            (f"-{days} days",),
+        )
+        _commit(conn)
+
+
+def get_outbox_counts() -> dict[str, int]:
+    """Get number of outbox items per status"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT status, COUNT(*) AS count FROM outbox GROUP BY status")
+        return {row["status"]: row["count"] for row in cursor.fetchall()}
+
+
+def get_cached_price(key: str) -> str | None:
+    """Get cached raw price for a normalized text key"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT price FROM price_cache WHERE key = ?", (key,))
+        row = cursor.fetchone()
+        return row["price"] if row else None
+
+
+def save_cached_price(key: str, price: str) -> None:
+    """Save raw price for a normalized text key"""
+    with get_db() as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO price_cache (key, price, created_at)
+            VALUES (?, ?, CURRENT_TIMESTAMP)
+            """,
+            (key, price),
+        )
+        _commit(conn)
+
+
+def prune_price_cache(max_age_days: int, max_rows: int) -> None:
+    """Delete cached prices older than max age and beyond max rows"""
+    with get_db() as conn:
+        conn.execute(
+            "DELETE FROM price_cache WHERE created_at < datetime('now', ?)",
+            (f"-{max_age_days} days",),
+        )
+        conn.execute(
+            """
+            DELETE FROM price_cache
+            WHERE key NOT IN (
+                SELECT key FROM price_cache ORDER BY created_at DESC LIMIT ?
+            )
+            """,
+            (max_rows,),
+        )
+        _commit(conn)
+
+
+def get_cached_peers() -> dict[str, Tuple[int, int]]:
+    """Get cached marked peer ID and access hash per username"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT username, peer_id, access_hash FROM peer_cache")
+        return {
+            row["username"]: (row["peer_id"], row["access_hash"])
+            for row in cursor.fetchall()
+        }
+
+
+def save_cached_peer(username: str, peer_id: int, access_hash: int) -> None:
+    """Save resolved marked peer ID and access hash of a username"""
+    with get_db() as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO peer_cache (
+                username, peer_id, access_hash, updated_at
+            )
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            """,
+            (username, peer_id, access_hash),
+        )
+        _commit(conn)
+
+
+def delete_cached_peer(username: str) -> None:
+    """Forget resolved peer of a username"""
+    with get_db() as conn:
+        conn.execute("DELETE FROM peer_cache WHERE username = ?", (username,))
+        _commit(conn)
+
+
 def add_run_history(status: str, message: str, type: str = "info") -> None:
     """Add new run history entry"""
+    created_at = get_db_now().strftime("%Y-%m-%d %H:%M:%S")
     with get_db() as conn:
         conn.execute(
             """
-            INSERT INTO run_history (status, type, message)
-            VALUES (?, ?, ?)
+            INSERT INTO run_history (status, type, message, created_at)
+            VALUES (?, ?, ?, ?)
             """,
-            (status, type, message),
+            (status, type, message, created_at),
         )
-        conn.commit()
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO last_runs (type, status, message, created_at)
+            VALUES (?, ?, ?, ?)
+            """,
+            (type, status, message, created_at),
+        )
+        _commit(conn)
+        entry = {
+            "status": status,
+            "type": type,
+            "message": message,
+            "created_at": created_at,
+        }
+
+        def remember(_: sqlite3.Connection) -> None:
+            _last_runs[type] = entry
+
+        _after_commit(conn, remember)
         logger.info("Added new run history entry")
 
 
-def get_run_history(limit: int = 10) -> list[dict]:
-    """Get recent run history"""
+def _run_history_filters(
+    type: str | None, status: str | None, since: str | None, until: str | None
+) -> Tuple[List[str], List[Any]]:
+    """Build WHERE conditions and parameters for run history filters"""
+    conditions: List[str] = []
+    params: List[Any] = []
+    for condition, value in (
+        ("type = ?", type),
+        ("status = ?", status),
+        ("created_at >= ?", since),
+        ("created_at < ?", until),
+    ):
+        if value is not None:
+            conditions.append(condition)
+            params.append(value)
+    return conditions, params
+
+
+def get_run_history(
+    limit: int = 10,
+    before_id: int | None = None,
+    type: str | None = None,
+    status: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+) -> list[dict]:
+    """Get run history newest first, continuing below before_id"""
+    conditions, params = _run_history_filters(type, status, since, until)
+    if before_id is not None:
+        conditions.append("id < ?")
+        params.append(before_id)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute(
-            """
-            SELECT status, message, created_at
+            f"""
+            SELECT id, status, type, message, created_at
             FROM run_history
-            ORDER BY created_at DESC
+            {where}
+            ORDER BY id DESC
             LIMIT ?
             """,
-            (limit,),
+            (*params, limit),
         )
         rows = cursor.fetchall()
         return [dict(row) for row in rows]
 
 
+def get_run_history_after(
+    after_id: int,
+    limit: int,
+    type: str | None = None,
+    status: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+) -> list[dict]:
+    """Get run history oldest first, continuing above after_id"""
+    conditions, params = _run_history_filters(type, status, since, until)
+    conditions.append("id > ?")
+    params.append(after_id)
+
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"""
+            SELECT id, status, type, message, created_at
+            FROM run_history
+            WHERE {" AND ".join(conditions)}
+            ORDER BY id
+            LIMIT ?
+            """,
+            (*params, limit),
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+
 def get_last_run_by_type(type: str) -> dict | None:
     """Get last run by type"""
+    if type in _last_runs:
+        return dict(_last_runs[type])
+
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute(
             """
             SELECT status, type, message, created_at
-            FROM run_history
+            FROM last_runs
             WHERE type = ?
-            ORDER BY created_at DESC
-            LIMIT 1
             """,
             (type,),
         )
         row = cursor.fetchone()
-        return dict(row) if row else None
+        if not row:
+            return None
+        _last_runs[type] = dict(row)
+        return dict(row)
+
+
+def prune_run_history(days: int, max_rows: int) -> int:
+    """Roll up and delete run history past retention, then vacuum freed pages"""
+    with get_db() as conn:
+        row = conn.execute(
+            """
+            SELECT
+                (SELECT MAX(id) FROM run_history
+                 WHERE created_at < datetime('now', ?)) AS expired_id,
+                (SELECT MAX(id) FROM run_history) - ? AS overflow_id
+            """,
+            (f"-{days} days", max_rows),
+        ).fetchone()
+        cutoff_id = max(row["expired_id"] or 0, row["overflow_id"] or 0)
+        if cutoff_id <= 0:
+            return 0
+
+        conn.execute(
+            """
+            INSERT INTO run_history_rollup (day, type, status, count)
+            SELECT date(created_at), type, status, COUNT(*)
+            FROM run_history
+            WHERE id <= ?
+            GROUP BY date(created_at), type, status
+            ON CONFLICT (day, type, status)
+            DO UPDATE SET count = count + excluded.count
+            """,
+            (cutoff_id,),
+        )
+        deleted = conn.execute(
+            "DELETE FROM run_history WHERE id <= ?", (cutoff_id,)
+        ).rowcount
+        _commit(conn)
+        _after_commit(conn, _incremental_vacuum)
+        logger.info(f"Pruned {deleted} run history entries")
+        return deleted
+
+
+def get_run_history_rollup(limit: int = 30) -> list[dict]:
+    """Get daily counts of pruned run history, newest first"""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT day, type, status, count
+            FROM run_history_rollup
+            ORDER BY day DESC, type, status
+            LIMIT ?
+            """,
+            (limit,),
+        )
+        return [dict(row) for row in cursor.fetchall()]
 
 
 def reset_db_except_config() -> None:
@@ -243,10 +1113,11 @@ def reset_db_except_config() -> None:
         all_tables = conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
 
         for table in all_tables:
-            if table["name"] != "config":
+            if table["name"] not in ("config", "config_version"):
                 conn.execute(f"DELETE FROM {table['name']}")
 
-        conn.commit()
+        _commit(conn)
+        _last_runs.clear()
 
         logger.info("Database reset completed (except config table)")
 
@@ -261,7 +1132,7 @@ def save_phone_code_hash(hash_value: str) -> None:
             """,
             (hash_value,),
         )
-        conn.commit()
+        _commit(conn)
         logger.info("Phone code hash saved")
 
 
@@ -285,5 +1156,5 @@ def clear_phone_code_hash() -> None:
     """Clear all phone code hashes from database"""
     with get_db() as conn:
         conn.execute("DELETE FROM phone_code_hash")
-        conn.commit()
+        _commit(conn)
         logger.info("Phone code hashes cleared")
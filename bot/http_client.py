@@ -0,0 +1,40 @@
+import aiohttp
+from .logger import logger
+from .settings import (
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_KEEPALIVE_SECONDS,
+    HTTP_POOL_SIZE,
+    HTTP_READ_TIMEOUT,
+)
+
+# Pooled session shared by all outgoing HTTP calls
+_session: aiohttp.ClientSession | None = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Get shared HTTP session, creating it on first use"""
+    global _session
+
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_SIZE,
+            keepalive_timeout=HTTP_KEEPALIVE_SECONDS,
+            ttl_dns_cache=300,
+        )
+        timeout = aiohttp.ClientTimeout(
+            connect=HTTP_CONNECT_TIMEOUT, sock_read=HTTP_READ_TIMEOUT
+        )
+        _session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        logger.info("HTTP session opened")
+
+    return _session
+
+
+async def close_http_session() -> None:
+    """Close shared HTTP session and its pooled connections"""
+    global _session
+
+    if _session and not _session.closed:
+        await _session.close()
+        logger.info("HTTP session closed")
+    _session = None
@@ -1,80 +1,338 @@
 from telethon import TelegramClient
-from telethon.tl.types import Message
+from telethon.errors import (
+    FileReferenceExpiredError,
+    FileReferenceInvalidError,
+    FloodWaitError,
+)
+from telethon.tl.types import (
+    Document,
+    InputDocument,
+    InputMediaDocument,
+    InputMediaPhoto,
+    InputPhoto,
+    Message,
+    MessageMediaDocument,
+    MessageMediaPhoto,
+    Photo,
+    PhotoSize,
+    PhotoSizeProgressive,
+)
 import asyncio
-from typing import List
+import hashlib
+import time
+from typing import Any, Dict, List, Set
 from .config import get_config
-from .price_parser import parse_message_text, is_fee_message
+from .album_assembler import Album, AlbumAssembler
+from .price_parser import parse_message_text
 from .logger import logger
-from .db import get_last_message_id, update_last_message_id
+from .metrics import (
+    CHANNEL_ERRORS,
+    CHANNEL_MESSAGES_FETCHED,
+    CHANNEL_PROCESS_SECONDS,
+    SEND_FLOOD_WAITS,
+    SEND_SECONDS,
+)
+from .db import (
+    OutboxItem,
+    claim_post_fingerprint,
+    get_last_message_id,
+)
+from .async_db import db_read, db_write
+from .client import handle_client_error, with_flood_wait
+from .peer_cache import with_peer
+from .rate_limiter import get_rate_limiter
+from .unit_of_work import enqueue_posts, flush_posts
+from .settings import CHANNEL_PAGE_SIZE, DEDUP_WINDOW_MINUTES, SEND_MAX_RETRIES
 
+# Serializes runs of the same channel between the scheduler and realtime mode
+_channel_locks: Dict[str, asyncio.Lock] = {}
 
-async def send_media_group(client: TelegramClient, messages: List[Message]) -> None:
-    """Send media group with price message to target channel"""
-    if not messages:
-        return
+# Channels whose last run left a recent, possibly incomplete album unsent
+_held_channels: Set[str] = set()
+
+
+def _photo_size(photo: Photo) -> str:
+    """Describe the largest size of a photo as 'WxH:bytes'"""
+    sizes = []
+    for size in photo.sizes:
+        if isinstance(size, PhotoSize):
+            sizes.append((size.w, size.h, size.size))
+        elif isinstance(size, PhotoSizeProgressive) and size.sizes:
+            sizes.append((size.w, size.h, max(size.sizes)))
+
+    if not sizes:
+        return ""
+    width, height, byte_size = max(sizes, key=lambda item: item[2])
+    return f"{width}x{height}:{byte_size}"
+
+
+def _media_ref(msg: Message) -> dict:
+    """Serialize message media so it can be sent later from the outbox"""
+    media = msg.media
+    if isinstance(media, MessageMediaPhoto) and isinstance(media.photo, Photo):
+        return {
+            "type": "photo",
+            "message_id": msg.id,
+            "id": media.photo.id,
+            "access_hash": media.photo.access_hash,
+            "file_reference": media.photo.file_reference.hex(),
+            "size": _photo_size(media.photo),
+        }
+    if isinstance(media, MessageMediaDocument) and isinstance(media.document, Document):
+        return {
+            "type": "document",
+            "message_id": msg.id,
+            "id": media.document.id,
+            "access_hash": media.document.access_hash,
+            "file_reference": media.document.file_reference.hex(),
+            "size": f"{media.document.mime_type}:{media.document.size}",
+        }
+    # Other media types are fetched again from the source message when sending
+    return {"type": "message", "message_id": msg.id}
+
+
+async def _load_media(
+    client: TelegramClient, channel: str, refs: List[dict], refresh: bool = False
+) -> List[Any]:
+    """Build sendable media from stored refs, re-fetching messages if needed"""
+    if refresh or any(ref["type"] == "message" for ref in refs):
+        ids = [ref["message_id"] for ref in refs]
+        messages = await with_flood_wait(
+            lambda: with_peer(
+                client, channel, lambda peer: client.get_messages(peer, ids=ids)
+            )
+        )
+        return [msg.media for msg in messages if msg and msg.media]
+
+    media: List[Any] = []
+    for ref in refs:
+        file_reference = bytes.fromhex(ref["file_reference"])
+        if ref["type"] == "photo":
+            media.append(
+                InputMediaPhoto(
+                    InputPhoto(ref["id"], ref["access_hash"], file_reference)
+                )
+            )
+        else:
+            media.append(
+                InputMediaDocument(
+                    InputDocument(ref["id"], ref["access_hash"], file_reference)
+                )
+            )
+    return media
+
+
+async def send_media_group(
+    client: TelegramClient, target_channel: str, text: str, media: List[Any]
+) -> None:
+    """Send media group with price text to target channel"""
+    limiter = get_rate_limiter(target_channel)
+
+    for attempt in range(SEND_MAX_RETRIES + 1):
+        await limiter.acquire()
+        started = time.perf_counter()
+        try:
+            await with_peer(
+                client,
+                target_channel,
+                lambda peer: client.send_message(peer, message=text, file=media),
+            )
+        except FloodWaitError as e:
+            # The limiter holds every send to this chat for the requested time
+            SEND_FLOOD_WAITS.inc(chat=target_channel)
+            limiter.on_flood_wait(e.seconds)
+            continue
 
-    message = messages.pop()
-    text = await parse_message_text(message)
-    if not text:
+        SEND_SECONDS.observe(time.perf_counter() - started, chat=target_channel)
+        limiter.on_success()
+        logger.info(f"Sent message group to {target_channel}")
         return
 
+    raise Exception(
+        f"Flood wait retries exhausted sending to {target_channel} "
+        f"after {SEND_MAX_RETRIES} retries"
+    )
+
+
+def _post_fingerprint(item: OutboxItem) -> str:
+    """Fingerprint post by media sizes (or file ids) and normalized text"""
+    media_keys = sorted(
+        f"{ref['type']}:{ref.get('size') or ref.get('id') or ref['message_id']}"
+        for ref in item.media
+    )
+    if any(ref["type"] == "message" for ref in item.media):
+        # Media kept only as message refs can not be compared across channels
+        media_keys.append(item.channel_id)
+
+    text = " ".join(item.text.lower().split())
+    return hashlib.sha256("|".join([text, *media_keys]).encode("utf-8")).hexdigest()
+
+
+async def send_outbox_item(client: TelegramClient, item: OutboxItem) -> bool:
+    """Send a prepared outbox post, return False if it was a recent duplicate"""
+    if DEDUP_WINDOW_MINUTES and not await db_write(
+        claim_post_fingerprint,
+        _post_fingerprint(item),
+        item.id,
+        item.channel_id,
+        DEDUP_WINDOW_MINUTES,
+    ):
+        logger.info(f"Skipping duplicate post from channel {item.channel_id}")
+        return False
+
+    # Expired file references are refreshed once from the source messages
+    media = await _load_media(client, item.channel_id, item.media)
     try:
-        config = get_config()
-        await client.send_message(
-            config.target_channel, message=text, file=[msg.media for msg in messages]
+        await send_media_group(client, item.target_channel, item.text, media)
+    except (FileReferenceExpiredError, FileReferenceInvalidError):
+        logger.info(f"Refreshing file references for outbox item {item.id}")
+        media = await _load_media(client, item.channel_id, item.media, refresh=True)
+        await send_media_group(client, item.target_channel, item.text, media)
+    return True
+
+
+def _build_outbox_items(
+    channel: str, target_channel: str, text: str, album: Album
+) -> List[OutboxItem]:
+    """Build outbox items for an album, one per valid Telegram album chunk"""
+    items = []
+    for index, chunk in enumerate(album.chunks()):
+        chunk_ids = [msg.id for msg in chunk]
+        source_message_ids = sorted(chunk_ids)
+        if index == 0 and album.price_message:
+            source_message_ids = sorted(set(chunk_ids) | {album.price_message.id})
+
+        items.append(
+            OutboxItem(
+                idempotency_key=f"{channel}:{','.join(map(str, source_message_ids))}",
+                channel_id=channel,
+                target_channel=target_channel,
+                # Only the first chunk carries the price caption
+                text=text if index == 0 else "",
+                media=[_media_ref(msg) for msg in chunk],
+                source_message_ids=source_message_ids,
+            )
         )
-        logger.info(f"Sent message group to {config.target_channel}")
-    except Exception as e:
-        logger.error(f"Error sending message: {e}")
+    return items
 
-    await asyncio.sleep(5)
 
+async def _enqueue_albums(
+    channel: str, albums: List[Album], settled_id: int, checkpoint_id: int
+) -> int:
+    """Parse prices and enqueue albums, checkpointing after each album"""
+    # Parse prices concurrently, then enqueue albums oldest first
+    texts = await asyncio.gather(
+        *(
+            parse_message_text(album.price_message)
+            for album in albums
+            if album.price_message
+        )
+    )
+    config = get_config()
 
-async def process_channel(client: TelegramClient, channel: str) -> None:
-    """Process messages from a single channel"""
-    try:
-        logger.info(f"Processing channel: {channel}")
-        last_message_id = get_last_message_id(channel)
+    priced_albums = [album for album in albums if album.price_message]
+    for album, text in zip(priced_albums, texts):
+        items = []
+        if text:
+            items = _build_outbox_items(channel, config.target_channel, text, album)
+        # Enqueue posts together with the checkpoint so a crash never loses them
+        await enqueue_posts(channel, items, album.checkpoint_id)
+        checkpoint_id = album.checkpoint_id
 
-        kwargs = {
-            "limit": 20,
-        }
+    if settled_id > checkpoint_id:
+        await enqueue_posts(channel, [], settled_id)
+        checkpoint_id = settled_id
+    return checkpoint_id
 
-        if last_message_id != -1:
-            kwargs["min_id"] = last_message_id
 
-        messages: List[Message] = await client.get_messages(channel, **kwargs)
+async def process_channel(client: TelegramClient, channel: str) -> int | None:
+    """Process messages from a single channel, return count or None on error"""
+    lock = _channel_locks.setdefault(channel, asyncio.Lock())
+    async with lock:
+        with CHANNEL_PROCESS_SECONDS.time(channel=channel):
+            fetched = await _process_channel(client, channel)
 
-        if not messages:
-            logger.info(f"No new messages in channel: {channel}")
-            return
+    if fetched is None:
+        CHANNEL_ERRORS.inc(channel=channel)
+    else:
+        CHANNEL_MESSAGES_FETCHED.inc(fetched, channel=channel)
+    return fetched
 
-        first_media_seen = False
-        media_group_messages: List[Message] = []
-        newest_message_id = last_message_id
 
-        for msg in messages:
-            # Track the newest message ID
-            if msg.id > newest_message_id:
-                newest_message_id = msg.id
+def has_held_album(channel: str) -> bool:
+    """Check if the channel's last run left a recent album for a later pass"""
+    return channel in _held_channels
 
-            if not first_media_seen and not msg.media:
-                continue
 
-            first_media_seen = True
+async def _get_start_cursor(client: TelegramClient, channel: str) -> int:
+    """Get message ID to stream from, the latest page on the first run"""
+    last_message_id = await db_read(get_last_message_id, channel)
+    if last_message_id != -1:
+        return last_message_id
 
-            if msg.text and is_fee_message(msg.text):
-                media_group_messages.append(msg)
-                await send_media_group(client, media_group_messages)
-                media_group_messages.clear()
-            elif msg.media:
-                media_group_messages.append(msg)
+    # First run starts from the latest page instead of the full history
+    latest: List[Message] = await with_flood_wait(
+        lambda: with_peer(
+            client,
+            channel,
+            lambda peer: client.get_messages(peer, limit=CHANNEL_PAGE_SIZE),
+        )
+    )
+    if not latest:
+        return 0
+    return min(msg.id for msg in latest) - 1
+
+
+async def _process_channel(client: TelegramClient, channel: str) -> int | None:
+    """Stream new messages of a channel oldest-first in checkpointed pages"""
+    try:
+        logger.info(f"Processing channel: {channel}")
+        cursor = await _get_start_cursor(client, channel)
+        checkpoint_id = cursor
+        assembler = AlbumAssembler()
+        assembler.settled_id = cursor
+        fetched = 0
 
-        # Update the last processed message ID
-        if newest_message_id > last_message_id:
-            update_last_message_id(channel, newest_message_id)
+        while True:
+            page: List[Message] = await with_flood_wait(
+                lambda: with_peer(
+                    client,
+                    channel,
+                    lambda peer: client.get_messages(
+                        peer, limit=CHANNEL_PAGE_SIZE, min_id=cursor, reverse=True
+                    ),
+                )
+            )
+            exhausted = len(page) < CHANNEL_PAGE_SIZE
+            if page:
+                fetched += len(page)
+                cursor = page[-1].id
+
+            # Albums cut by the page boundary stay buffered until the next page
+            albums = assembler.feed(page, final=exhausted)
+            checkpoint_id = await _enqueue_albums(
+                channel, albums, assembler.settled_id, checkpoint_id
+            )
+            # Each page's posts and checkpoint commit together, so a long
+            # backlog is bounded in memory, resumable and sent while it streams
+            await flush_posts()
+
+            if exhausted:
+                break
+
+        if assembler.held:
+            _held_channels.add(channel)
+        else:
+            _held_channels.discard(channel)
+
+        if not fetched:
+            logger.info(f"No new messages in channel: {channel}")
+            return 0
 
-        logger.info(f"Finished processing channel: {channel}")
+        logger.info(f"Finished processing channel: {channel}, {fetched} messages")
+        return fetched
 
     except Exception as e:
+        handle_client_error(e)
         logger.error(f"Error processing channel {channel}: {e}")
+        return None
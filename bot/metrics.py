@@ -0,0 +1,222 @@
+import bisect
+from abc import ABC, abstractmethod
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Final, Iterator, List, Tuple
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS: Final[Tuple[float, ...]] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+)
+DB_BUCKETS: Final[Tuple[float, ...]] = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.5,
+    1,
+)
+LAG_BUCKETS: Final[Tuple[float, ...]] = (0.5, 1, 5, 15, 30, 60, 120, 300, 900)
+
+
+def _escape(value: str) -> str:
+    """Escape label value for the Prometheus text format"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues) -> str:
+    """Format label pairs as {name="value",...}"""
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return f"{{{pairs}}}"
+
+
+def _format_value(value: float) -> str:
+    """Format sample value, integers without a decimal point"""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric(ABC):
+    """Named metric with fixed label names, safe to update from any thread"""
+
+    type = ""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        """Get label values in declared order"""
+        return tuple(str(labels[name]) for name in self.labels)
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Get exposition lines of the metric's samples"""
+
+    def render(self) -> str:
+        """Render metric in the Prometheus text format"""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        return "\n".join(lines + self.samples())
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()) -> None:
+        super().__init__(name, help, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Add amount to the counter of a label set"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        """Get exposition lines of the metric's samples"""
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: count per bucket (last one is +Inf), sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record an observed value for a label set"""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[index] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration of the enclosed block in seconds"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> List[str]:
+        """Get exposition lines of the metric's samples"""
+        with self._lock:
+            values = sorted(
+                (key, (list(counts), total[0]))
+                for key, (counts, total) in self._values.items()
+            )
+
+        lines = []
+        names = (*self.labels, "le")
+        for key, (counts, total) in values:
+            cumulative = 0
+            bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                labels = _format_labels(names, (*key, bound))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+_registry: List[_Metric] = []
+
+
+def render_metrics() -> str:
+    """Render all metrics in the Prometheus text exposition format"""
+    return "\n".join(metric.render() for metric in _registry) + "\n"
+
+
+CHANNEL_PROCESS_SECONDS = Histogram(
+    "bot_channel_process_seconds",
+    "Duration of processing a source channel",
+    ("channel",),
+)
+CHANNEL_MESSAGES_FETCHED = Counter(
+    "bot_channel_messages_fetched_total",
+    "Messages fetched from a source channel",
+    ("channel",),
+)
+CHANNEL_ERRORS = Counter(
+    "bot_channel_errors_total",
+    "Failed source channel runs",
+    ("channel",),
+)
+GEMINI_REQUEST_SECONDS = Histogram(
+    "bot_gemini_request_seconds",
+    "Latency of Gemini price extraction requests",
+)
+GEMINI_REQUESTS = Counter(
+    "bot_gemini_requests_total",
+    "Gemini price extraction requests by outcome",
+    ("outcome",),
+)
+SEND_SECONDS = Histogram(
+    "bot_send_seconds",
+    "Latency of sending a media group to the target channel",
+    ("chat",),
+)
+SEND_FLOOD_WAITS = Counter(
+    "bot_send_flood_waits_total",
+    "FloodWait errors received while sending",
+    ("chat",),
+)
+DB_CALL_SECONDS = Histogram(
+    "bot_db_call_seconds",
+    "Duration of database calls run through the async facade",
+    ("operation", "kind"),
+    buckets=DB_BUCKETS,
+)
+SCHEDULER_LAG_SECONDS = Histogram(
+    "bot_scheduler_lag_seconds",
+    "Delay between a channel's planned run time and its start",
+    buckets=LAG_BUCKETS,
+)
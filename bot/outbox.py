@@ -0,0 +1,130 @@
+import asyncio
+from typing import List, Set
+from .async_db import db_read, db_write
+from .client import get_client, handle_client_error
+from .db import (
+    OutboxItem,
+    claim_outbox_item,
+    get_due_outbox_heads,
+    mark_outbox_duplicate,
+    mark_outbox_failed,
+    mark_outbox_sent,
+    prune_outbox,
+    release_outbox_item,
+    requeue_interrupted_outbox,
+)
+from .logger import logger
+from .status import request_status_refresh
+from .message_handler import send_outbox_item
+from .settings import (
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_POLL_SECONDS,
+    OUTBOX_RETENTION_DAYS,
+    OUTBOX_RETRY_BASE_SECONDS,
+    OUTBOX_WORKERS,
+)
+
+_wakeup = asyncio.Event()
+_workers: List[asyncio.Task] = []
+
+# Channels with an item being sent, keeps sends FIFO per source channel
+_busy_channels: Set[str] = set()
+
+
+def notify_outbox() -> None:
+    """Wake idle send workers after new items were enqueued"""
+    _wakeup.set()
+
+
+async def _claim_next_item() -> OutboxItem | None:
+    """Claim the oldest due item of a channel that has no send in flight"""
+    for item in await db_read(get_due_outbox_heads, limit=OUTBOX_WORKERS * 50):
+        if item.channel_id in _busy_channels:
+            continue
+
+        # Mark the channel busy before awaiting so no other worker claims
+        # its next item while this claim is in flight
+        _busy_channels.add(item.channel_id)
+        claimed = False
+        try:
+            claimed = await db_write(claim_outbox_item, item.id)
+        finally:
+            if not claimed:
+                _busy_channels.discard(item.channel_id)
+        if claimed:
+            return item
+
+    return None
+
+
+async def _send_item(item: OutboxItem) -> None:
+    """Send a claimed item and record the result"""
+    try:
+        client = await get_client()
+    except Exception as e:
+        logger.warning(f"Outbox send postponed: {e}")
+        await db_write(release_outbox_item, item.id)
+        await asyncio.sleep(OUTBOX_POLL_SECONDS)
+        return
+
+    try:
+        if await send_outbox_item(client, item):
+            await db_write(mark_outbox_sent, item.id)
+        else:
+            await db_write(mark_outbox_duplicate, item.id)
+    except Exception as e:
+        handle_client_error(e)
+        retry_in_seconds = OUTBOX_RETRY_BASE_SECONDS * 2**item.attempts
+        await db_write(
+            mark_outbox_failed,
+            item.id,
+            str(e),
+            retry_in_seconds,
+            OUTBOX_MAX_ATTEMPTS,
+        )
+        logger.error(f"Error sending outbox item {item.id}: {e}")
+
+
+async def _worker() -> None:
+    """Drain the outbox until cancelled"""
+    while True:
+        try:
+            item = await _claim_next_item()
+            if not item:
+                _wakeup.clear()
+                try:
+                    await asyncio.wait_for(_wakeup.wait(), OUTBOX_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await _send_item(item)
+            finally:
+                _busy_channels.discard(item.channel_id)
+                _wakeup.set()
+                request_status_refresh()
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Outbox worker error: {e}")
+            await asyncio.sleep(OUTBOX_POLL_SECONDS)
+
+
+def start_outbox_workers() -> None:
+    """Start send workers, recovering items interrupted by a previous crash"""
+    requeue_interrupted_outbox()
+    prune_outbox(OUTBOX_RETENTION_DAYS)
+
+    for _ in range(max(OUTBOX_WORKERS, 1)):
+        _workers.append(asyncio.create_task(_worker()))
+    logger.info(f"Started {len(_workers)} outbox workers")
+
+
+async def stop_outbox_workers() -> None:
+    """Cancel send workers"""
+    for worker in _workers:
+        worker.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
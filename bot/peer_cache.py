@@ -0,0 +1,110 @@
+from typing import Awaitable, Callable, Dict, Iterable, Tuple, TypeVar
+from telethon import TelegramClient, utils
+from telethon.errors import (
+    ChannelIdInvalidError,
+    ChannelInvalidError,
+    PeerIdInvalidError,
+)
+from telethon.tl.types import (
+    InputPeerChannel,
+    InputPeerChat,
+    InputPeerUser,
+    PeerChannel,
+    PeerChat,
+    TypeInputPeer,
+)
+from .async_db import db_read, db_write
+from .client import with_flood_wait
+from .db import delete_cached_peer, get_cached_peers, save_cached_peer
+from .logger import logger
+
+T = TypeVar("T")
+
+# Errors meaning a cached peer no longer resolves to a usable chat
+PEER_INVALID_ERRORS: Tuple[type[Exception], ...] = (
+    ChannelIdInvalidError,
+    ChannelInvalidError,
+    PeerIdInvalidError,
+)
+
+# In-process copy of the peer_cache table, loaded once
+_peers: Dict[str, TypeInputPeer] = {}
+_loaded = False
+
+
+def _build_peer(peer_id: int, access_hash: int) -> TypeInputPeer:
+    """Build input peer from a marked peer ID and access hash"""
+    real_id, peer_type = utils.resolve_id(peer_id)
+    if peer_type is PeerChannel:
+        return InputPeerChannel(real_id, access_hash)
+    if peer_type is PeerChat:
+        return InputPeerChat(real_id)
+    return InputPeerUser(real_id, access_hash)
+
+
+async def load_peer_cache() -> None:
+    """Load cached peers from the database into memory"""
+    global _loaded
+
+    for username, (peer_id, access_hash) in (await db_read(get_cached_peers)).items():
+        _peers.setdefault(username, _build_peer(peer_id, access_hash))
+    _loaded = True
+
+
+async def resolve_peer(client: TelegramClient, username: str) -> TypeInputPeer:
+    """Get input peer of a username, resolving it over the network only once"""
+    if not _loaded:
+        await load_peer_cache()
+
+    peer = _peers.get(username)
+    if peer is not None:
+        return peer
+
+    peer = await with_flood_wait(lambda: client.get_input_entity(username))
+    _peers[username] = peer
+    if isinstance(peer, (InputPeerChannel, InputPeerChat, InputPeerUser)):
+        await db_write(
+            save_cached_peer,
+            username,
+            utils.get_peer_id(peer),
+            getattr(peer, "access_hash", 0),
+        )
+    logger.info(f"Resolved peer for {username}")
+    return peer
+
+
+def get_peer_or_username(username: str) -> TypeInputPeer | str:
+    """Get cached peer of a username, or the username when not resolved yet"""
+    return _peers.get(username, username)
+
+
+async def invalidate_peer(username: str) -> None:
+    """Forget cached peer of a username so the next use resolves it again"""
+    _peers.pop(username, None)
+    await db_write(delete_cached_peer, username)
+
+
+async def warm_peer_cache(client: TelegramClient, usernames: Iterable[str]) -> None:
+    """Resolve peers missing from the cache ahead of a run"""
+    for username in usernames:
+        if not username or username in _peers:
+            continue
+        try:
+            await resolve_peer(client, username)
+        except Exception as e:
+            logger.error(f"Error resolving peer {username}: {e}")
+
+
+async def with_peer(
+    client: TelegramClient,
+    username: str,
+    call: Callable[[TypeInputPeer], Awaitable[T]],
+) -> T:
+    """Run call with the cached peer, resolving again once if it went stale"""
+    peer = await resolve_peer(client, username)
+    try:
+        return await call(peer)
+    except PEER_INVALID_ERRORS as e:
+        logger.warning(f"Cached peer for {username} is invalid: {e}")
+        await invalidate_peer(username)
+        return await call(await resolve_peer(client, username))
@@ -0,0 +1,56 @@
+from datetime import datetime
+from typing import Final, Tuple
+from .settings import (
+    ADAPTIVE_POLL_MAX_FACTOR,
+    ADAPTIVE_POLL_MIN_MINUTES,
+    ADAPTIVE_POLL_TARGET_MESSAGES,
+    ADAPTIVE_POLLING,
+)
+
+# Weight of the latest sweep in the smoothed arrival rate
+RATE_SMOOTHING: Final[float] = 0.3
+
+
+def poll_bounds(base_minutes: int) -> Tuple[int, int]:
+    """Get shortest and longest poll interval (seconds) for a base interval"""
+    shortest = min(ADAPTIVE_POLL_MIN_MINUTES, base_minutes) * 60
+    longest = base_minutes * max(ADAPTIVE_POLL_MAX_FACTOR, 1) * 60
+    return shortest, longest
+
+
+def effective_interval(state: dict | None, base_minutes: int) -> int:
+    """Get poll interval (seconds) of a channel, learned one when adaptive"""
+    if not ADAPTIVE_POLLING or not state or not state.get("interval_seconds"):
+        return base_minutes * 60
+    shortest, longest = poll_bounds(base_minutes)
+    return min(max(state["interval_seconds"], shortest), longest)
+
+
+def next_poll_state(
+    state: dict | None, fetched: int | None, base_minutes: int, now: datetime
+) -> Tuple[float, int]:
+    """Learn arrival rate from a sweep and pick the next poll interval"""
+    rate = state["rate_per_hour"] if state else 0.0
+    interval = effective_interval(state, base_minutes)
+
+    # The first sweep reads older history and a failed one tells nothing
+    if not state or fetched is None:
+        return rate, interval
+
+    last_run_at = datetime.strptime(state["last_run_at"], "%Y-%m-%d %H:%M:%S")
+    elapsed_hours = max((now - last_run_at).total_seconds(), 1) / 3600
+    rate = RATE_SMOOTHING * fetched / elapsed_hours + (1 - RATE_SMOOTHING) * rate
+    if not ADAPTIVE_POLLING:
+        return rate, interval
+
+    if fetched:
+        # Aim for a fixed number of new messages per poll, but a channel that
+        # posts is never polled less often than configured
+        rate_interval = int(3600 * ADAPTIVE_POLL_TARGET_MESSAGES / rate)
+        interval = min(rate_interval, base_minutes * 60)
+    else:
+        # Back off exponentially while the channel stays quiet
+        interval *= 2
+
+    shortest, longest = poll_bounds(base_minutes)
+    return rate, min(max(interval, shortest), longest)
@@ -0,0 +1,56 @@
+import asyncio
+from typing import Awaitable, Callable, List, Set, Tuple
+from .logger import logger
+
+BatchExtractor = Callable[[List[str]], Awaitable[List[str | None]]]
+
+
+class PriceBatcher:
+    """Collect price texts for a short window and extract them in one request"""
+
+    def __init__(self, extract: BatchExtractor, window: float, max_size: int) -> None:
+        self._extract = extract
+        self._window = window
+        self._max_size = max(max_size, 1)
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def extract(self, text: str) -> str | None:
+        """Queue text for the next batch and wait for its raw price"""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self._max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Start extraction of all pending texts"""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Extract unique texts of a batch and resolve their futures"""
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            prices = await self._extract(texts)
+        except Exception as e:
+            logger.error(f"Error extracting price batch: {e}")
+            prices = [None] * len(texts)
+
+        results = dict(zip(texts, prices))
+        for text, future in batch:
+            if not future.done():
+                future.set_result(results.get(text))
@@ -0,0 +1,70 @@
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Dict, Final
+from .async_db import db_read, db_write
+from .db import get_cached_price as get_db_cached_price
+from .db import prune_price_cache, save_cached_price
+from .settings import PRICE_CACHE_MAX_AGE_DAYS, PRICE_CACHE_MAX_ROWS, PRICE_CACHE_SIZE
+
+WHITESPACE_PATTERN: Final[re.Pattern] = re.compile(r"\s+")
+PRUNE_EVERY_WRITES: Final[int] = 100
+
+# In-process LRU in front of the price_cache table
+_memory_cache: "OrderedDict[str, str]" = OrderedDict()
+_writes_since_prune = 0
+_stats: Dict[str, int] = {"memory_hits": 0, "db_hits": 0, "misses": 0}
+
+
+def _cache_key(text: str) -> str:
+    """Build cache key from normalized message text"""
+    normalized = WHITESPACE_PATTERN.sub(" ", text).strip().lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _remember(key: str, price: str) -> None:
+    """Store price in the in-process LRU"""
+    _memory_cache[key] = price
+    _memory_cache.move_to_end(key)
+    while len(_memory_cache) > PRICE_CACHE_SIZE:
+        _memory_cache.popitem(last=False)
+
+
+async def get_cached_price(text: str) -> str | None:
+    """Get raw extracted price for text from memory or database"""
+    key = _cache_key(text)
+
+    if key in _memory_cache:
+        _memory_cache.move_to_end(key)
+        _stats["memory_hits"] += 1
+        return _memory_cache[key]
+
+    price = await db_read(get_db_cached_price, key)
+    if price is None:
+        _stats["misses"] += 1
+        return None
+
+    _stats["db_hits"] += 1
+    _remember(key, price)
+    return price
+
+
+async def cache_price(text: str, price: str) -> None:
+    """Cache raw extracted price (before fee) for text"""
+    global _writes_since_prune
+
+    key = _cache_key(text)
+    _remember(key, price)
+    _writes_since_prune += 1
+    await db_write(save_cached_price, key, price)
+
+    if _writes_since_prune >= PRUNE_EVERY_WRITES:
+        _writes_since_prune = 0
+        await db_write(
+            prune_price_cache, PRICE_CACHE_MAX_AGE_DAYS, PRICE_CACHE_MAX_ROWS
+        )
+
+
+def get_price_cache_stats() -> Dict[str, int]:
+    """Get price cache hit/miss counters"""
+    return {**_stats, "memory_size": len(_memory_cache)}
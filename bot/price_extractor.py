@@ -0,0 +1,68 @@
+import re
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import Final, List
+
+# Amounts with Turkish separators: 1.250,00 / 1250,5 / 1250 / 1250.50
+AMOUNT: Final[str] = r"\d{1,3}(?:\.\d{3})+(?:,\d{1,2})?|\d+(?:[.,]\d{1,2})?"
+TL_PRICE_PATTERN: Final[re.Pattern] = re.compile(
+    rf"(?:₺\s*(?P<prefixed>{AMOUNT}))|"
+    rf"(?:(?P<suffixed>{AMOUNT})\s*(?:₺|(?:tl|try)(?![a-zçğıöşü])))",
+    re.IGNORECASE,
+)
+AMOUNT_PATTERN: Final[re.Pattern] = re.compile(AMOUNT)
+# Digits right before an amount, e.g. "1 250 tl", make the amount unreliable
+LEADING_DIGITS_PATTERN: Final[re.Pattern] = re.compile(r"\d[\s.,]$")
+
+# Confidence when several different TL amounts appear in one text
+AMBIGUOUS_CONFIDENCE: Final[float] = 0.4
+
+
+@dataclass
+class LocalPrice:
+    """Price extracted without calling the LLM"""
+
+    price: str | None
+    confidence: float
+
+
+def parse_amount(amount: str) -> Decimal | None:
+    """Parse amount written with Turkish or plain separators"""
+    if "," in amount:
+        normalized = amount.replace(".", "").replace(",", ".")
+    elif re.fullmatch(r"\d{1,3}(?:\.\d{3})+", amount):
+        normalized = amount.replace(".", "")
+    else:
+        normalized = amount
+
+    try:
+        return Decimal(normalized)
+    except InvalidOperation:
+        return None
+
+
+def format_price(amount: Decimal) -> str:
+    """Format amount as 'X TL', keeping kuruş only when present"""
+    if amount == amount.to_integral_value():
+        return f"{int(amount)} TL"
+    return f"{amount:.2f}".replace(".", ",") + " TL"
+
+
+def extract_price_locally(text: str) -> LocalPrice:
+    """Extract TL price with precompiled patterns and score the result"""
+    amounts: List[Decimal] = []
+    ambiguous = False
+    for match in TL_PRICE_PATTERN.finditer(text):
+        amount = parse_amount(match.group("prefixed") or match.group("suffixed"))
+        if amount is not None and amount not in amounts:
+            amounts.append(amount)
+        if LEADING_DIGITS_PATTERN.search(text, 0, match.start()):
+            ambiguous = True
+
+    if not amounts:
+        return LocalPrice(price=None, confidence=0.0)
+
+    confidence = 1.0
+    if ambiguous or len(amounts) > 1:
+        confidence = AMBIGUOUS_CONFIDENCE
+    return LocalPrice(price=format_price(amounts[0]), confidence=confidence)
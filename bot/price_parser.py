@@ -1,32 +1,81 @@
+import json
 import re
-from typing import Final, Set
-import aiohttp
+from typing import Final, List, Set
 from telethon.tl.types import Message
 from .config import get_config
+from .http_client import get_http_session
 from .logger import logger
+from .metrics import GEMINI_REQUEST_SECONDS, GEMINI_REQUESTS
+from .price_batcher import PriceBatcher
+from .price_cache import cache_price, get_cached_price
+from .price_extractor import (
+    AMOUNT_PATTERN,
+    extract_price_locally,
+    format_price,
+    parse_amount,
+)
+from .settings import (
+    GEMINI_BASE_URL,
+    GEMINI_BATCH_SIZE,
+    GEMINI_BATCH_WINDOW_MS,
+    GEMINI_MODEL,
+    LOCAL_PRICE_MIN_CONFIDENCE,
+)
 
 FEE_FLAGS: Final[Set[str]] = {"tl", "₺"}
 GEMINI_URL: Final[str] = (
-    "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent"
+    f"{GEMINI_BASE_URL.rstrip('/')}/models/{GEMINI_MODEL}:generateContent"
 )
+JSON_FENCE_PATTERN: Final[re.Pattern] = re.compile(r"^```(?:json)?|```$")
 
 
-def add_fee_to_price(price_text: str) -> str:
+def add_fee_to_price(price_text: str, fee: int | None = None) -> str:
     """Add fee to the price and return formatted string"""
-    try:
-        config = get_config()
-        match = re.search(r"(\d+)", price_text)
-        if match is None:
-            return price_text
-        price = int(match.group(1))
-        total_price = price + config.add_fee
-        return f"{total_price} TL"
-    except (AttributeError, ValueError):
+    if fee is None:
+        fee = get_config().add_fee
+
+    match = AMOUNT_PATTERN.search(price_text)
+    if match is None:
         return price_text
 
+    price = parse_amount(match.group(0))
+    if price is None:
+        return price_text
+    return format_price(price + fee)
 
-async def parse_price_with_gemini(text: str) -> str:
-    """Parse price using Gemini AI"""
+
+def _valid_price(price: str | None) -> str | None:
+    """Get Gemini's price reply if it holds an amount, None otherwise"""
+    if isinstance(price, str) and AMOUNT_PATTERN.search(price):
+        return price.strip()
+    return None
+
+
+async def _generate_content(prompt: str, json_response: bool = False) -> str | None:
+    """Send prompt to Gemini and return the text of the first candidate"""
+    payload: dict = {"contents": [{"parts": [{"text": prompt}]}]}
+    if json_response:
+        payload["generationConfig"] = {"responseMimeType": "application/json"}
+
+    config = get_config()
+    text = None
+    try:
+        with GEMINI_REQUEST_SECONDS.time():
+            async with get_http_session().post(
+                f"{GEMINI_URL}?key={config.gemini_api_key}", json=payload
+            ) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    if "candidates" in data:
+                        text = data["candidates"][0]["content"]["parts"][0]["text"]
+    finally:
+        GEMINI_REQUESTS.inc(outcome="success" if text is not None else "error")
+
+    return text.strip() if text is not None else None
+
+
+async def _extract_price_with_gemini(text: str) -> str | None:
+    """Extract raw price using Gemini AI"""
     prompt = f"""
     Extract only the TL/₺ price from this text and format it as 'X TL': {text}
     Example input: "250₺=7.30$=6.75€"
@@ -34,29 +83,87 @@ async def parse_price_with_gemini(text: str) -> str:
     Only return the formatted price, nothing else.
     """
 
-    async with aiohttp.ClientSession() as session:
-        try:
-            config = get_config()
-            async with session.post(
-                f"{GEMINI_URL}?key={config.gemini_api_key}",
-                json={"contents": [{"parts": [{"text": prompt}]}]},
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if "candidates" in data:
-                        price = data["candidates"][0]["content"]["parts"][0][
-                            "text"
-                        ].strip()
-                        return add_fee_to_price(price)
-
-        except Exception as e:
-            logger.error(f"Error parsing price with Gemini: {e}")
-
-    # Fallback: Basic regex parsing if Gemini fails
-    match = re.search(r"(\d+)(?:TL|₺)", text)
-    if match:
-        price = f"{match.group(1)} TL"
-        return add_fee_to_price(price)
+    try:
+        return _valid_price(await _generate_content(prompt))
+    except Exception as e:
+        logger.error(f"Error parsing price with Gemini: {e}")
+
+    return None
+
+
+def _parse_batch_response(response: str | None, count: int) -> List[str | None]:
+    """Parse indexed JSON batch response, using None for malformed items"""
+    prices: List[str | None] = [None] * count
+    if not response:
+        return prices
+
+    try:
+        data = json.loads(JSON_FENCE_PATTERN.sub("", response.strip()).strip())
+    except json.JSONDecodeError:
+        logger.warning("Malformed Gemini batch response, using regex fallback")
+        return prices
+
+    if not isinstance(data, dict):
+        return prices
+
+    for index in range(count):
+        prices[index] = _valid_price(data.get(str(index + 1)))
+    return prices
+
+
+async def _extract_prices_with_gemini(texts: List[str]) -> List[str | None]:
+    """Extract raw prices of several texts with a single Gemini request"""
+    if len(texts) == 1:
+        return [await _extract_price_with_gemini(texts[0])]
+
+    numbered = "\n".join(f"{index + 1}. {text}" for index, text in enumerate(texts))
+    prompt = f"""
+    Extract only the TL/₺ price from each numbered text and format it as 'X TL'.
+    Return a JSON object mapping each number to its price, use null if a text
+    has no TL/₺ price.
+    Example input: 1. 250₺=7.30$=6.75€
+    Example output: {{"1": "250 TL"}}
+    Texts:
+    {numbered}
+    """
+
+    try:
+        response = await _generate_content(prompt, json_response=True)
+    except Exception as e:
+        logger.error(f"Error parsing price batch with Gemini: {e}")
+        response = None
+
+    return _parse_batch_response(response, len(texts))
+
+
+_batcher = PriceBatcher(
+    _extract_prices_with_gemini,
+    window=GEMINI_BATCH_WINDOW_MS / 1000,
+    max_size=GEMINI_BATCH_SIZE,
+)
+
+
+async def parse_price_with_gemini(text: str) -> str:
+    """Parse price locally when confident, otherwise with Gemini, and add fee"""
+    fee = get_config().add_fee
+
+    local = extract_price_locally(text)
+    if local.price and local.confidence * 100 >= LOCAL_PRICE_MIN_CONFIDENCE:
+        return add_fee_to_price(local.price, fee)
+
+    # Entries cached before replies were validated may hold no amount
+    price = _valid_price(await get_cached_price(text))
+    if price is None:
+        price = await _batcher.extract(text)
+        if price:
+            await cache_price(text, price)
+
+    if price:
+        return add_fee_to_price(price, fee)
+
+    # Fallback: best local guess if Gemini fails
+    if local.price:
+        return add_fee_to_price(local.price, fee)
     return text
 
 
@@ -0,0 +1,91 @@
+import asyncio
+import time
+from typing import Dict
+from .logger import logger
+from .settings import (
+    SEND_BURST,
+    SEND_RATE_MAX_PER_MINUTE,
+    SEND_RATE_MIN_PER_MINUTE,
+    SEND_RATE_PER_MINUTE,
+)
+
+
+class TokenBucket:
+    """Token bucket rate limiter that adapts to Telegram flood waits"""
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        capacity: float,
+        min_rate_per_minute: float,
+        max_rate_per_minute: float,
+    ) -> None:
+        self._rate = rate_per_minute / 60
+        self._min_rate = min_rate_per_minute / 60
+        self._max_rate = max_rate_per_minute / 60
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def current_rate(self) -> float:
+        """Current allowed rate in sends per minute"""
+        return round(self._rate * 60, 2)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        """Wait until a send is allowed and consume a token"""
+        async with self._lock:
+            while True:
+                blocked_for = self._blocked_until - time.monotonic()
+                if blocked_for > 0:
+                    await asyncio.sleep(blocked_for)
+                    continue
+
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+    def on_success(self) -> None:
+        """Slowly raise the rate after a successful send"""
+        self._rate = min(self._max_rate, self._rate + self._min_rate)
+
+    def on_flood_wait(self, seconds: int) -> None:
+        """Block for the requested time and halve the rate"""
+        self._blocked_until = time.monotonic() + seconds
+        self._rate = max(self._min_rate, self._rate / 2)
+        self._tokens = 0
+        logger.warning(
+            f"Flood wait of {seconds}s, send rate lowered to "
+            f"{self.current_rate}/min"
+        )
+
+
+_rate_limiters: Dict[str, TokenBucket] = {}
+
+
+def get_rate_limiter(chat: str) -> TokenBucket:
+    """Get send rate limiter for a target chat"""
+    if chat not in _rate_limiters:
+        _rate_limiters[chat] = TokenBucket(
+            rate_per_minute=SEND_RATE_PER_MINUTE,
+            capacity=SEND_BURST,
+            min_rate_per_minute=SEND_RATE_MIN_PER_MINUTE,
+            max_rate_per_minute=SEND_RATE_MAX_PER_MINUTE,
+        )
+    return _rate_limiters[chat]
+
+
+def get_send_rates() -> Dict[str, float]:
+    """Get current send rate per target chat in sends per minute"""
+    return {chat: limiter.current_rate for chat, limiter in _rate_limiters.items()}
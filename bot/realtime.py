@@ -0,0 +1,132 @@
+import asyncio
+import time
+from typing import Any, Callable, Coroutine, Dict, List, Tuple
+from telethon import TelegramClient, events
+from .client import get_client, get_connection_epoch, is_bot_logged
+from .config import get_config
+from .logger import logger
+from .message_handler import has_held_album, process_channel
+from .outbox import notify_outbox
+from .peer_cache import get_peer_or_username, warm_peer_cache
+from .status import request_status_refresh
+from .settings import ALBUM_SETTLE_SECONDS, REALTIME_DEBOUNCE_SECONDS
+
+EventHandler = Callable[[Any], Coroutine[Any, Any, None]]
+
+# Handlers attached to the shared client for realtime forwarding
+_handler_client: TelegramClient | None = None
+_handler_channels: Tuple[str, ...] = ()
+_handler_epoch = 0
+_handlers: List[EventHandler] = []
+
+# Channels with unprocessed events and the time of their latest event
+_dirty_at: Dict[str, float] = {}
+_channel_tasks: Dict[str, asyncio.Task] = {}
+
+
+async def _process_when_quiet(client: TelegramClient, channel: str) -> None:
+    """Process channel once no new event arrived for the debounce window"""
+    while channel in _dirty_at:
+        delay = _dirty_at[channel] + REALTIME_DEBOUNCE_SECONDS - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+            continue
+
+        del _dirty_at[channel]
+        await process_channel(client, channel)
+        notify_outbox()
+        request_status_refresh()
+
+        if has_held_album(channel) and channel not in _dirty_at:
+            # An album still uploading was left unsent, look again once it
+            # has settled instead of waiting for the next scheduled sweep
+            _dirty_at[channel] = (
+                time.monotonic() + ALBUM_SETTLE_SECONDS - REALTIME_DEBOUNCE_SECONDS
+            )
+
+
+def _mark_dirty(client: TelegramClient, channel: str) -> None:
+    """Schedule channel processing after its latest event"""
+    _dirty_at[channel] = time.monotonic()
+
+    task = _channel_tasks.get(channel)
+    if not task or task.done():
+        _channel_tasks[channel] = asyncio.create_task(
+            _process_when_quiet(client, channel)
+        )
+
+
+def _make_handler(client: TelegramClient, channel: str) -> EventHandler:
+    """Create new message handler bound to a source channel"""
+
+    async def handler(event: Any) -> None:
+        logger.info(f"New message {event.message.id} in channel: {channel}")
+        _mark_dirty(client, channel)
+
+    return handler
+
+
+def _detach_handlers() -> None:
+    """Remove realtime handlers from the client they were attached to"""
+    global _handler_client, _handler_channels
+
+    if _handler_client:
+        for handler in _handlers:
+            _handler_client.remove_event_handler(handler)
+        logger.info("Realtime forwarding stopped")
+
+    _handlers.clear()
+    _handler_client = None
+    _handler_channels = ()
+
+
+async def stop_realtime() -> None:
+    """Detach realtime handlers and cancel pending channel passes"""
+    _detach_handlers()
+    _dirty_at.clear()
+    tasks = list(_channel_tasks.values())
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    _channel_tasks.clear()
+
+
+async def sync_realtime_handlers() -> None:
+    """Attach or detach realtime handlers to match the current configuration"""
+    global _handler_client, _handler_channels, _handler_epoch
+
+    config = get_config()
+    channels: Tuple[str, ...] = ()
+    if config.is_active and config.realtime_mode:
+        channels = tuple(config.source_channels)
+
+    if not channels or not await is_bot_logged():
+        _detach_handlers()
+        return
+
+    client = await get_client()
+    if client is _handler_client and channels == _handler_channels:
+        if _handler_epoch != get_connection_epoch():
+            # Updates may have been missed while the client was disconnected
+            _handler_epoch = get_connection_epoch()
+            for channel in channels:
+                _mark_dirty(client, channel)
+        return
+
+    _detach_handlers()
+    await warm_peer_cache(client, channels)
+    for channel in channels:
+        handler = _make_handler(client, channel)
+        client.add_event_handler(
+            handler, events.NewMessage(chats=get_peer_or_username(channel))
+        )
+        _handlers.append(handler)
+
+    _handler_client = client
+    _handler_channels = channels
+    _handler_epoch = get_connection_epoch()
+    logger.info(f"Realtime forwarding started for: {', '.join(channels)}")
+
+    # Catch up from the stored checkpoints before relying on events
+    for channel in channels:
+        _mark_dirty(client, channel)
@@ -1,52 +1,272 @@
 import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, List, Set
+from telethon import TelegramClient
 
-from bot.utils import get_bot_runable
-from .client import get_client
-from .config import get_config
+from bot.utils import get_channel_due_times
+from .async_db import db_read, db_write
+from .client import (
+    flood_wait_remaining,
+    get_client,
+    handle_client_error,
+    is_bot_logged,
+)
+from .config import BotConfig, get_channel_schedule, get_config, subscribe_config
 from .message_handler import process_channel
+from .outbox import notify_outbox
+from .realtime import stop_realtime, sync_realtime_handlers
 from .logger import logger
-from .db import add_run_history
+from .metrics import SCHEDULER_LAG_SECONDS
+from .db import add_run_history, get_channel_run, get_db_now, prune_run_history
+from .peer_cache import warm_peer_cache
+from .poll_rates import next_poll_state
+from .priority_semaphore import PrioritySemaphore
+from .status import refresh_status_snapshot
+from .unit_of_work import run_unit_of_work
+from .settings import (
+    CHANNEL_WORKERS,
+    RUN_HISTORY_MAX_ROWS,
+    RUN_HISTORY_RETENTION_DAYS,
+    SCHEDULER_RETRY_SECONDS,
+)
 
+# Realtime handlers are re-checked this often to recover after reconnects
+REALTIME_SYNC_SECONDS = 60
 
-async def run_bot() -> None:
-    """Run bot process"""
+# Wakes the scheduler before its deadline
+_wakeup = asyncio.Event()
+_config_changed = False
+_run_requested = False
+
+# Channel slots shared by all runs, so a due high-priority channel starts
+# before the rest of a long low-priority sweep
+_channel_slots = PrioritySemaphore(max(CHANNEL_WORKERS, 1))
+
+# Channels of runs in progress, and when failed channels may be retried
+_in_flight: Set[str] = set()
+_retry_at: Dict[str, datetime] = {}
+_pending_retry: Set[str] = set()
+_run_tasks: Set[asyncio.Task] = set()
+_scheduler_task: asyncio.Task | None = None
+
+
+async def run_bot(channels: List[str] | None = None) -> bool:
+    """Run bot process for channels (all by default), return success"""
     config = get_config()
 
     if not config.is_active:
         logger.info("Bot is not active, skipping run")
-        return
+        return False
+
+    if channels is None:
+        channels = config.source_channels
+    failed: List[str] = []
+
+    async def process_in_slot(client: TelegramClient, channel: str) -> None:
+        async with _channel_slots.slot(get_channel_schedule(config, channel).priority):
+            # Each channel's posts, checkpoint and sweep time are saved in one
+            # transaction as soon as it is done, so a fast channel is free to
+            # run again without waiting for the rest of the sweep
+            async with run_unit_of_work() as channel_unit:
+                fetched = await process_channel(client, channel)
+                if fetched is not None:
+                    rate, interval = next_poll_state(
+                        await db_read(get_channel_run, channel),
+                        fetched,
+                        get_channel_schedule(config, channel).interval_minutes
+                        or config.interval_minutes,
+                        get_db_now(),
+                    )
+                    channel_unit.record_channel_run(channel, rate, interval)
+
+        _pending_retry.discard(channel)
+        if fetched is None:
+            # Not recorded as swept, so it is retried soon instead of waiting
+            # for its full interval
+            failed.append(channel)
+            # A flood wait too long to sleep through is honoured as well
+            _retry_at[channel] = get_db_now() + timedelta(
+                seconds=max(SCHEDULER_RETRY_SECONDS, flood_wait_remaining())
+            )
+        else:
+            _retry_at.pop(channel, None)
+        _in_flight.discard(channel)
+        _wakeup.set()
 
-    client = await get_client()
     try:
-        for channel in config.source_channels:
-            await process_channel(client, channel)
+        client = await get_client()
+        # Usernames resolve from the peer cache, so only new ones cost a request
+        await warm_peer_cache(client, [*channels, config.target_channel])
+
+        async with run_unit_of_work() as unit:
+            await asyncio.gather(
+                *(process_in_slot(client, channel) for channel in channels)
+            )
+            if failed:
+                unit.add_history(
+                    "error",
+                    f"Scheduled run failed for channels: {', '.join(failed)}",
+                    type="process",
+                )
+            else:
+                unit.add_history(
+                    "success",
+                    "Scheduled run completed. "
+                    f"Processed channels: {', '.join(channels)}",
+                    type="process",
+                )
+        notify_outbox()
 
-        add_run_history(
-            "success",
-            f"Scheduled run completed. Processed channels: {', '.join(config.source_channels)}",  # noqa: E501
-            type="process",
+        await db_write(
+            prune_run_history, RUN_HISTORY_RETENTION_DAYS, RUN_HISTORY_MAX_ROWS
         )
-        logger.info("Scheduled run completed successfully")
+        logger.info("Scheduled run completed")
+        return not failed
 
     except Exception as e:
+        handle_client_error(e)
+        notify_outbox()
         error_msg = f"Scheduled run failed: {str(e)}"
-        add_run_history("error", error_msg)
+        await db_write(add_run_history, "error", error_msg)
         logger.error(error_msg)
+        return False
 
     finally:
-        await client.disconnect()
+        await refresh_status_snapshot()
+
+
+def wake_scheduler() -> None:
+    """Make the scheduler re-check config and deadlines now"""
+    _wakeup.set()
+
+
+def request_run() -> None:
+    """Ask the scheduler to run now regardless of the interval"""
+    global _run_requested
+    _run_requested = True
+    _wakeup.set()
+
+
+def _on_config_change(config: BotConfig) -> None:
+    """Wake the scheduler after a configuration change"""
+    global _config_changed
+    _config_changed = True
+    _wakeup.set()
+
+
+async def _run_channels(channels: List[str]) -> None:
+    """Run channels in the background, backing off when the run fails"""
+    # Channels that complete their sweep clear this, the rest back off
+    _pending_retry.update(channels)
+    try:
+        await run_bot(channels)
+    except Exception as e:
+        logger.error(f"Scheduled run failed: {e}")
+    finally:
+        _in_flight.difference_update(channels)
+        retry_at = get_db_now() + timedelta(
+            seconds=max(SCHEDULER_RETRY_SECONDS, flood_wait_remaining())
+        )
+        for channel in channels:
+            if channel in _pending_retry:
+                _pending_retry.discard(channel)
+                _retry_at[channel] = retry_at
+        _wakeup.set()
+
+
+def _start_run(channels: List[str]) -> None:
+    """Start a run for due channels unless they are already running"""
+    _in_flight.update(channels)
+    task = asyncio.create_task(_run_channels(channels))
+    _run_tasks.add(task)
+    task.add_done_callback(_run_tasks.discard)
+
+
+async def _run_when_due(run_now: bool) -> float | None:
+    """Start due channels, return seconds until the next is due, None to wait"""
+    config = get_config()
+    if not config.is_active:
+        logger.info("Bot is not active, waiting for configuration change")
+        return None
+
+    if not await is_bot_logged():
+        logger.info("Bot is not logged in, skipping run")
+        return SCHEDULER_RETRY_SECONDS
+
+    now = get_db_now()
+    due_times = {
+        channel: max(due_at, _retry_at.get(channel, due_at))
+        for channel, due_at in (await get_channel_due_times(config)).items()
+        if channel not in _in_flight
+    }
+
+    due = [channel for channel, due_at in due_times.items() if run_now or due_at <= now]
+    if due:
+        for channel in due:
+            SCHEDULER_LAG_SECONDS.observe(
+                max((now - due_times[channel]).total_seconds(), 0)
+            )
+        logger.info(f"Starting run for channels: {', '.join(due)}")
+        _start_run(due)
+
+    # Running channels are rescheduled when their run wakes the scheduler
+    upcoming = [due_at for channel, due_at in due_times.items() if channel not in due]
+    if not upcoming:
+        return None
+
+    delay = (min(upcoming) - now).total_seconds()
+    logger.info(f"Next channel due in {delay:.0f} seconds")
+    return max(delay, 0)
 
 
 async def scheduler() -> None:
-    """Main scheduler loop"""
+    """Main scheduler loop, sleeps until the next run is due or it is woken"""
+    global _config_changed, _run_requested
+
     logger.info("Starting scheduler")
+    subscribe_config(_on_config_change)
 
     while True:
+        _wakeup.clear()
+        config_changed, _config_changed = _config_changed, False
+        run_now, _run_requested = _run_requested, False
+
+        delay: float | None = SCHEDULER_RETRY_SECONDS
         try:
-            if await get_bot_runable():
-                await run_bot()
-            else:
-                logger.info("Bot is not runable, skipping run")
+            await sync_realtime_handlers()
+            if config_changed:
+                await refresh_status_snapshot()
+            delay = await _run_when_due(run_now)
+            config = get_config()
+            if config.is_active and config.realtime_mode:
+                delay = min(
+                    REALTIME_SYNC_SECONDS if delay is None else delay,
+                    REALTIME_SYNC_SECONDS,
+                )
         except Exception as e:
             logger.error(f"Scheduler error: {e}")
-        await asyncio.sleep(60)
+
+        try:
+            await asyncio.wait_for(_wakeup.wait(), delay)
+        except asyncio.TimeoutError:
+            pass
+
+
+def start_scheduler() -> None:
+    """Start the scheduler loop in a background task"""
+    global _scheduler_task
+    _scheduler_task = asyncio.create_task(scheduler())
+
+
+async def stop_scheduler() -> None:
+    """Cancel the scheduler loop, runs in progress and realtime passes"""
+    global _scheduler_task
+
+    tasks = list(_run_tasks)
+    if _scheduler_task:
+        tasks.append(_scheduler_task)
+        _scheduler_task = None
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await stop_realtime()
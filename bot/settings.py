@@ -1,6 +1,6 @@
 import os
 import json
-from typing import List
+from typing import Dict, List
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -18,6 +18,18 @@ def get_list_from_env(key: str, default: List | None = None) -> List:
         return value.split(",")
 
 
+def get_dict_from_env(key: str, default: Dict | None = None) -> Dict:
+    """Get JSON object from environment variable"""
+    value = os.getenv(key)
+    if not value:
+        return default or {}
+    try:
+        parsed = json.loads(value)
+    except json.JSONDecodeError:
+        return default or {}
+    return parsed if isinstance(parsed, dict) else default or {}
+
+
 def get_bool_from_env(key: str, default: bool = False) -> bool:
     """Get boolean from environment variable"""
     value = os.getenv(key, str(default)).lower()
@@ -44,4 +56,89 @@ DEFAULT_CONFIG = {
     "gemini_api_key": os.getenv("GEMINI_API_KEY", ""),
     "is_active": get_bool_from_env("IS_ACTIVE", False),
     "interval_minutes": get_int_from_env("INTERVAL_MINUTES", 60),
+    "realtime_mode": get_bool_from_env("REALTIME_MODE", False),
+    "channel_schedules": get_dict_from_env("CHANNEL_SCHEDULES", {}),
 }
+
+
+# SQLite tuning
+DB_JOURNAL_MODE = os.getenv("DB_JOURNAL_MODE", "WAL")
+DB_CACHE_SIZE_KB = get_int_from_env("DB_CACHE_SIZE_KB", 8192)
+DB_STATEMENT_CACHE_SIZE = get_int_from_env("DB_STATEMENT_CACHE_SIZE", 256)
+DB_READ_POOL_SIZE = get_int_from_env("DB_READ_POOL_SIZE", 4)
+DB_WRITE_BATCH_SIZE = get_int_from_env("DB_WRITE_BATCH_SIZE", 64)
+
+# Run history retention
+RUN_HISTORY_RETENTION_DAYS = get_int_from_env("RUN_HISTORY_RETENTION_DAYS", 30)
+RUN_HISTORY_MAX_ROWS = get_int_from_env("RUN_HISTORY_MAX_ROWS", 5000)
+
+# Scheduler
+SCHEDULER_RETRY_SECONDS = get_int_from_env("SCHEDULER_RETRY_SECONDS", 60)
+
+# Adaptive polling
+ADAPTIVE_POLLING = get_bool_from_env("ADAPTIVE_POLLING", True)
+ADAPTIVE_POLL_MIN_MINUTES = get_int_from_env("ADAPTIVE_POLL_MIN_MINUTES", 1)
+ADAPTIVE_POLL_MAX_FACTOR = get_int_from_env("ADAPTIVE_POLL_MAX_FACTOR", 8)
+ADAPTIVE_POLL_TARGET_MESSAGES = get_int_from_env("ADAPTIVE_POLL_TARGET_MESSAGES", 5)
+
+# Telegram client connection settings
+CLIENT_RECONNECT_ATTEMPTS = get_int_from_env("CLIENT_RECONNECT_ATTEMPTS", 5)
+CLIENT_RECONNECT_BASE_DELAY = get_int_from_env("CLIENT_RECONNECT_BASE_DELAY", 1)
+CLIENT_RECONNECT_MAX_DELAY = get_int_from_env("CLIENT_RECONNECT_MAX_DELAY", 60)
+AUTH_CACHE_TTL_SECONDS = get_int_from_env("AUTH_CACHE_TTL_SECONDS", 300)
+# Flood waits up to this long are slept through when fetching or resolving
+FLOOD_WAIT_MAX_SLEEP_SECONDS = get_int_from_env("FLOOD_WAIT_MAX_SLEEP_SECONDS", 60)
+
+# Number of source channels processed concurrently during a run
+CHANNEL_WORKERS = get_int_from_env("CHANNEL_WORKERS", 1)
+
+# Messages fetched per page while catching up on a channel
+CHANNEL_PAGE_SIZE = get_int_from_env("CHANNEL_PAGE_SIZE", 50)
+
+# Albums newer than this at the end of a run may still be uploading
+ALBUM_SETTLE_SECONDS = get_int_from_env("ALBUM_SETTLE_SECONDS", 60)
+
+# Send rate limits per target chat (sends per minute)
+SEND_RATE_PER_MINUTE = get_int_from_env("SEND_RATE_PER_MINUTE", 20)
+SEND_RATE_MIN_PER_MINUTE = get_int_from_env("SEND_RATE_MIN_PER_MINUTE", 1)
+SEND_RATE_MAX_PER_MINUTE = get_int_from_env("SEND_RATE_MAX_PER_MINUTE", 30)
+SEND_BURST = get_int_from_env("SEND_BURST", 3)
+SEND_MAX_RETRIES = get_int_from_env("SEND_MAX_RETRIES", 3)
+
+# Outbox send workers
+OUTBOX_WORKERS = get_int_from_env("OUTBOX_WORKERS", 2)
+OUTBOX_MAX_ATTEMPTS = get_int_from_env("OUTBOX_MAX_ATTEMPTS", 5)
+OUTBOX_RETRY_BASE_SECONDS = get_int_from_env("OUTBOX_RETRY_BASE_SECONDS", 30)
+OUTBOX_POLL_SECONDS = get_int_from_env("OUTBOX_POLL_SECONDS", 5)
+OUTBOX_RETENTION_DAYS = get_int_from_env("OUTBOX_RETENTION_DAYS", 7)
+
+# Gemini API endpoint, the base URL can point to a local stub for benchmarks
+GEMINI_BASE_URL = os.getenv(
+    "GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta"
+)
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+
+# Minimum local extraction confidence (percent) to skip the Gemini call
+LOCAL_PRICE_MIN_CONFIDENCE = get_int_from_env("LOCAL_PRICE_MIN_CONFIDENCE", 80)
+
+# Price texts sent to Gemini in one request and how long to collect them
+GEMINI_BATCH_SIZE = get_int_from_env("GEMINI_BATCH_SIZE", 20)
+GEMINI_BATCH_WINDOW_MS = get_int_from_env("GEMINI_BATCH_WINDOW_MS", 500)
+
+# Shared HTTP client pool and timeouts (seconds)
+HTTP_POOL_SIZE = get_int_from_env("HTTP_POOL_SIZE", 10)
+HTTP_KEEPALIVE_SECONDS = get_int_from_env("HTTP_KEEPALIVE_SECONDS", 60)
+HTTP_CONNECT_TIMEOUT = get_int_from_env("HTTP_CONNECT_TIMEOUT", 5)
+HTTP_READ_TIMEOUT = get_int_from_env("HTTP_READ_TIMEOUT", 30)
+
+# Gemini price parsing cache
+PRICE_CACHE_SIZE = get_int_from_env("PRICE_CACHE_SIZE", 1024)
+PRICE_CACHE_MAX_AGE_DAYS = get_int_from_env("PRICE_CACHE_MAX_AGE_DAYS", 30)
+PRICE_CACHE_MAX_ROWS = get_int_from_env("PRICE_CACHE_MAX_ROWS", 10000)
+
+# Window in which identical posts from any source channel are sent once
+# (0 disables duplicate suppression)
+DEDUP_WINDOW_MINUTES = get_int_from_env("DEDUP_WINDOW_MINUTES", 60)
+
+# Seconds to wait for an album to finish arriving in realtime mode
+REALTIME_DEBOUNCE_SECONDS = get_int_from_env("REALTIME_DEBOUNCE_SECONDS", 3)
@@ -0,0 +1,95 @@
+import asyncio
+import hashlib
+import json
+from typing import Any, Dict, Final, Tuple
+from .async_db import db_read
+from .config import get_channel_schedule, get_config
+from .db import get_channel_checkpoints, get_last_run_by_type, get_outbox_counts
+from .logger import logger
+from .utils import get_channel_due_times, get_status_message
+
+# Precomputed /status payload and its ETag, rebuilt after runs and config edits
+_snapshot: Dict[str, Any] | None = None
+_etag = ""
+
+# Bursts of realtime passes and sends are folded into one rebuild
+REFRESH_DEBOUNCE_SECONDS: Final[float] = 2.0
+_refresh_task: asyncio.Task | None = None
+_refresh_requested = False
+
+
+async def refresh_status_snapshot() -> Tuple[Dict[str, Any], str]:
+    """Rebuild the status snapshot"""
+    global _snapshot, _etag
+
+    config = get_config()
+    last_run = await db_read(get_last_run_by_type, "process")
+    checkpoints = await db_read(get_channel_checkpoints)
+    outbox = await db_read(get_outbox_counts)
+    due_times = await get_channel_due_times(config)
+
+    next_run_at = None
+    if due_times and config.is_active:
+        next_run_at = min(due_times.values())
+
+    snapshot = {
+        "status": "active" if config.is_active else "inactive",
+        "message": get_status_message(config, next_run_at),
+        "last_run": last_run,
+        "next_run_at": (
+            next_run_at.strftime("%Y-%m-%d %H:%M:%S") if next_run_at else None
+        ),
+        "channels": [
+            {
+                "channel": channel,
+                "last_message_id": checkpoints.get(channel, {}).get("last_message_id"),
+                "updated_at": checkpoints.get(channel, {}).get("updated_at"),
+                "next_due_at": due_times[channel].strftime("%Y-%m-%d %H:%M:%S"),
+                **get_channel_schedule(config, channel).model_dump(),
+            }
+            for channel in config.source_channels
+        ],
+        "outbox": outbox,
+    }
+
+    digest = hashlib.sha1(json.dumps(snapshot, sort_keys=True).encode("utf-8"))
+    _snapshot, _etag = snapshot, f'"{digest.hexdigest()}"'
+    return _snapshot, _etag
+
+
+async def get_status_snapshot() -> Tuple[Dict[str, Any], str]:
+    """Get status snapshot and its ETag, building it on first use"""
+    if _snapshot is None:
+        return await refresh_status_snapshot()
+    return _snapshot, _etag
+
+
+async def _refresh_later() -> None:
+    """Rebuild the snapshot after the debounce window, again if re-requested"""
+    global _refresh_requested
+
+    while _refresh_requested:
+        await asyncio.sleep(REFRESH_DEBOUNCE_SECONDS)
+        _refresh_requested = False
+        try:
+            await refresh_status_snapshot()
+        except Exception as e:
+            logger.error(f"Error refreshing status snapshot: {e}")
+
+
+def request_status_refresh() -> None:
+    """Schedule a debounced snapshot rebuild after state changed"""
+    global _refresh_task, _refresh_requested
+
+    _refresh_requested = True
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.create_task(_refresh_later())
+
+
+async def cancel_status_refresh() -> None:
+    """Cancel a pending snapshot rebuild"""
+    global _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        await asyncio.gather(_refresh_task, return_exceptions=True)
+        _refresh_task = None
@@ -0,0 +1,81 @@
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import AsyncGenerator, Dict, List, Tuple
+from .async_db import db_write
+from .db import OutboxItem, enqueue_outbox, save_run
+from .logger import logger
+
+
+@dataclass
+class RunUnitOfWork:
+    """Outbox items, checkpoints and history staged during a run"""
+
+    outbox: Dict[str, Tuple[List[OutboxItem], int]] = field(default_factory=dict)
+    history: List[Tuple[str, str, str]] = field(default_factory=list)
+    channel_runs: List[Tuple[str, float, int]] = field(default_factory=list)
+
+    def stage_outbox(
+        self, channel: str, items: List[OutboxItem], message_id: int
+    ) -> None:
+        """Stage posts with the checkpoint they allow, in channel order"""
+        staged_items, staged_id = self.outbox.get(channel, ([], message_id))
+        self.outbox[channel] = (staged_items + items, max(staged_id, message_id))
+
+    def add_history(self, status: str, message: str, type: str = "info") -> None:
+        """Stage run history entry"""
+        self.history.append((status, message, type))
+
+    def record_channel_run(
+        self, channel: str, rate_per_hour: float, interval_seconds: int
+    ) -> None:
+        """Stage channel as swept, with its learned rate and poll interval"""
+        self.channel_runs.append((channel, rate_per_hour, interval_seconds))
+
+    async def flush(self) -> None:
+        """Write everything staged in one transaction"""
+        if not self.outbox and not self.history and not self.channel_runs:
+            return
+        outbox, history, channel_runs = self.outbox, self.history, self.channel_runs
+        self.outbox, self.history, self.channel_runs = {}, [], []
+        await db_write(save_run, outbox, history, channel_runs)
+
+
+# Unit of the run in progress, visible to every channel task of the run
+_current_unit: ContextVar[RunUnitOfWork | None] = ContextVar(
+    "current_unit", default=None
+)
+
+
+@asynccontextmanager
+async def run_unit_of_work() -> AsyncGenerator[RunUnitOfWork, None]:
+    """Stage a run's writes and flush them together when the run ends"""
+    unit = RunUnitOfWork()
+    token = _current_unit.set(unit)
+    try:
+        yield unit
+    finally:
+        _current_unit.reset(token)
+        # Items and checkpoints are staged in pairs, so even a failed run
+        # flushes a consistent state and never skips unsent messages
+        try:
+            await unit.flush()
+        except Exception as e:
+            logger.error(f"Error saving run: {e}")
+            raise
+
+
+async def flush_posts() -> None:
+    """Commit posts and checkpoints staged so far by the current unit"""
+    unit = _current_unit.get()
+    if unit is not None:
+        await unit.flush()
+
+
+async def enqueue_posts(channel: str, items: List[OutboxItem], message_id: int) -> None:
+    """Enqueue posts with their checkpoint, staged when a run is in progress"""
+    unit = _current_unit.get()
+    if unit is None:
+        await db_write(enqueue_outbox, channel, items, message_id)
+    else:
+        unit.stage_outbox(channel, items, message_id)
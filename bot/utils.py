@@ -1,17 +1,21 @@
 # cspell:disable
 
-from .config import get_config, BotConfig
-from .db import get_db_now, get_last_run_by_type
-from .client import is_bot_logged
+from typing import Dict
+from .config import get_channel_schedule, get_config, BotConfig
+from .db import get_channel_runs, get_db_now, get_last_run_by_type
+from .async_db import db_read
+from .poll_rates import effective_interval
 from datetime import datetime, timedelta
 
 
-def get_status_message(config: BotConfig | None = None) -> str:
+def get_status_message(
+    config: BotConfig | None = None, next_run_at: datetime | None = None
+) -> str:
     if not config:
-        config = get_config(True)
+        config = get_config()
 
     last_run_time = get_last_run_time_message()
-    next_run_str = get_next_run_time_message(config)
+    next_run_str = get_next_run_time_message(config, next_run_at)
     channels = ", ".join(config.source_channels)
 
     return (
@@ -34,7 +38,12 @@ def get_last_run_time_message() -> str:
     return "Henüz çalışmadı"
 
 
-def get_next_run_time_message(config: BotConfig) -> str:
+def get_next_run_time_message(
+    config: BotConfig, next_run_at: datetime | None = None
+) -> str:
+    if next_run_at and config.is_active:
+        return next_run_at.strftime("%d.%m.%Y %H:%M:%S")
+
     last_run = get_last_run_by_type("process")
     if last_run:
         last_run_datetime = datetime.strptime(
@@ -49,21 +58,21 @@ def get_next_run_time_message(config: BotConfig) -> str:
     return "Bot aktif değil"
 
 
-async def get_bot_runable() -> bool:
-    """Check if bot should run now"""
-    config = get_config(force=True)
-
-    if not config.is_active:
-        return False
-
-    if not await is_bot_logged():
-        return False
-
-    last_run = get_last_run_by_type("process")
-    if not last_run:
-        return True
-
+async def get_channel_due_times(config: BotConfig) -> Dict[str, datetime]:
+    """Get UTC time each source channel is next due, now if never swept"""
+    channel_runs = await db_read(get_channel_runs)
     now = get_db_now()
-    last_run_time = datetime.strptime(last_run["created_at"], "%Y-%m-%d %H:%M:%S")
 
-    return now > (last_run_time + timedelta(minutes=config.interval_minutes))
+    due_times = {}
+    for channel in config.source_channels:
+        state = channel_runs.get(channel)
+        if not state:
+            due_times[channel] = now
+            continue
+
+        base_minutes = get_channel_schedule(config, channel).interval_minutes
+        interval = effective_interval(state, base_minutes or config.interval_minutes)
+        due_times[channel] = datetime.strptime(
+            state["last_run_at"], "%Y-%m-%d %H:%M:%S"
+        ) + timedelta(seconds=interval)
+    return due_times
@@ -14,6 +14,14 @@ export function BotSettingsForm({ config, onConfigChange }) {
                     />
                 </div>
 
+                <div className="bg-white rounded-lg p-3 shadow-sm">
+                    <Switch
+                        checked={config.realtime_mode}
+                        onChange={(e) => onConfigChange('realtime_mode', e.target.checked)}
+                        label="Anlık Aktarım"
+                    />
+                </div>
+
                 <div className="bg-white rounded-lg p-3 shadow-sm">
                     <label className="block text-sm font-medium text-gray-700 mb-2">
                         Çalışma Aralığı
@@ -1,4 +1,11 @@
 export function ChannelSettingsForm({ config, onConfigChange }) {
+    const schedules = config.channel_schedules || {};
+
+    const updateSchedule = (channel, key, value) => {
+        const schedule = { ...schedules[channel], [key]: Number.isNaN(value) ? null : value };
+        onConfigChange('channel_schedules', { ...schedules, [channel]: schedule });
+    };
+
     return (
         <div className="bg-gray-50 p-4 rounded-lg space-y-4">
             <h3 className="font-medium text-gray-900">Kanal Ayarları</h3>
@@ -16,6 +23,35 @@ export function ChannelSettingsForm({ config, onConfigChange }) {
                 </div>
             </div>
 
+            {config.source_channels.length > 0 && (
+                <div>
+                    <label className="block text-sm font-medium text-gray-700">Kanal Zamanlaması</label>
+                    <div className="mt-1 space-y-2">
+                        {config.source_channels.map((channel) => (
+                            <div key={channel} className="flex items-center gap-2">
+                                <span className="flex-1 text-sm text-gray-700 truncate">{channel}</span>
+                                <input
+                                    type="number"
+                                    min="1"
+                                    value={schedules[channel]?.interval_minutes ?? ''}
+                                    onChange={(e) => updateSchedule(channel, 'interval_minutes', parseInt(e.target.value))}
+                                    className="w-24 px-2 py-1 rounded-md border border-gray-300 focus:ring-blue-500 focus:border-blue-500"
+                                    placeholder={`${config.interval_minutes} dk`}
+                                    title="Çalışma aralığı (dakika)"
+                                />
+                                <input
+                                    type="number"
+                                    value={schedules[channel]?.priority ?? 0}
+                                    onChange={(e) => updateSchedule(channel, 'priority', parseInt(e.target.value) || 0)}
+                                    className="w-20 px-2 py-1 rounded-md border border-gray-300 focus:ring-blue-500 focus:border-blue-500"
+                                    title="Öncelik (yüksek olan önce işlenir)"
+                                />
+                            </div>
+                        ))}
+                    </div>
+                </div>
+            )}
+
             <div>
                 <label className="block text-sm font-medium text-gray-700">Hedef Kanal</label>
                 <div className="mt-1">
@@ -22,6 +22,8 @@ ADD_FEE=20
 GEMINI_API_KEY=your_gemini_api_key
 IS_ACTIVE=false
 INTERVAL_MINUTES=60
+REALTIME_MODE=false
+CHANNEL_SCHEDULES={}
 EOL
 fi
 